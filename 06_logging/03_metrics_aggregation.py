@@ -0,0 +1,331 @@
+#!/usr/bin/python3
+"""
+In-Process Metrics Aggregation for MLOps
+Demonstrates counters, gauges and histograms that aggregate per-step
+training metrics in memory and flush periodic summaries to the
+structured log or a file, instead of one JSON line per measurement
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# Default histogram bucket upper bounds (seconds / generic values),
+# roughly exponential so a few dozen buckets cover several orders of magnitude
+DEFAULT_BUCKETS = tuple(round(0.0001 * 2 ** i, 6) for i in range(24))
+
+
+class _ShardedCells:
+    """Per-thread storage cells so hot-path updates never take a shared lock"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._local = threading.local()
+        self._cells = []
+        self._lock = threading.Lock()  # only taken when a new thread first records
+
+    def cell(self):
+        """Return the calling thread's cell, creating it on first use"""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._factory()
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def all_cells(self):
+        """Return a copy of every cell (cells outlive the threads that wrote them)"""
+        with self._lock:
+            return list(self._cells)
+
+
+class Counter:
+    """Monotonically increasing count (e.g. processed batches, errors)"""
+
+    def __init__(self, name):
+        self.name = name
+        self._shards = _ShardedCells(lambda: [0])
+
+    def inc(self, amount=1):
+        """Add amount to the calling thread's shard"""
+        self._shards.cell()[0] += amount
+
+    def value(self):
+        """Sum of all shards"""
+        return sum(cell[0] for cell in self._shards.all_cells())
+
+
+class Gauge:
+    """Last-written value (e.g. learning rate, GPU memory in use)"""
+
+    def __init__(self, name):
+        self.name = name
+        self._value = None
+
+    def set(self, value):
+        """Attribute assignment is atomic, so no lock is needed"""
+        self._value = value
+
+    def value(self):
+        return self._value
+
+
+class Histogram:
+    """Bucketed distribution of observations (e.g. step time, batch loss)"""
+
+    def __init__(self, name, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        n_buckets = len(self.buckets) + 1  # last bucket catches overflow
+        # cell layout: [count, sum, min, max, bucket_0, ..., bucket_n]
+        self._shards = _ShardedCells(
+            lambda: [0, 0.0, float("inf"), float("-inf")] + [0] * n_buckets
+        )
+
+    def observe(self, value):
+        """Record one observation in the calling thread's shard"""
+        cell = self._shards.cell()
+        cell[0] += 1
+        cell[1] += value
+        if value < cell[2]:
+            cell[2] = value
+        if value > cell[3]:
+            cell[3] = value
+        cell[4 + bisect.bisect_left(self.buckets, value)] += 1
+
+    def summary(self):
+        """Merge all shards into count/sum/mean/min/max and bucket percentiles"""
+        count, total = 0, 0.0
+        low, high = float("inf"), float("-inf")
+        merged = [0] * (len(self.buckets) + 1)
+        for cell in self._shards.all_cells():
+            count += cell[0]
+            total += cell[1]
+            low = min(low, cell[2])
+            high = max(high, cell[3])
+            for i, n in enumerate(cell[4:]):
+                merged[i] += n
+
+        if count == 0:
+            return {"count": 0}
+
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "mean": round(total / count, 6),
+            "min": low,
+            "max": high,
+            "p50": self._percentile(merged, count, 0.50, low, high),
+            "p90": self._percentile(merged, count, 0.90, low, high),
+            "p99": self._percentile(merged, count, 0.99, low, high),
+        }
+
+    def _percentile(self, merged, count, q, low, high):
+        """
+        Estimate a percentile by linear interpolation inside its bucket
+
+        Bucket edges are clipped to the observed min/max, so the first and
+        overflow buckets, and sparse data, do not report impossible values.
+        """
+        target = q * count
+        cumulative = 0
+        for i, n in enumerate(merged):
+            if n and cumulative + n >= target:
+                lower = max(self.buckets[i - 1] if i > 0 else low, low)
+                upper = min(self.buckets[i] if i < len(self.buckets) else high, high)
+                return round(lower + (upper - lower) * (target - cumulative) / n, 6)
+            cumulative += n
+        return high
+
+
+class MetricsRegistry:
+    """Named collection of metrics with a cheap point-in-time snapshot"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name, cls, *args):
+        metric = self._metrics.get(name)  # fast path: no lock once created
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, *args)
+                    self._metrics[name] = metric
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric '{name}' already registered as {type(metric).__name__}")
+        return metric
+
+    def counter(self, name):
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name):
+        return self._get_or_create(name, Gauge)
+
+    def histogram(self, name, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(name, Histogram, buckets)
+
+    def snapshot(self):
+        """Aggregate every metric into a JSON-serializable dict"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {"counters": {}, "gauges": {}, "histograms": {}}
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                snapshot["counters"][metric.name] = metric.value()
+            elif isinstance(metric, Gauge):
+                snapshot["gauges"][metric.name] = metric.value()
+            else:
+                snapshot["histograms"][metric.name] = metric.summary()
+        return snapshot
+
+
+def json_log_sink(snapshot):
+    """Emit a snapshot as one structured JSON log line (same shape as json_log)"""
+    print(json.dumps({"level": "INFO", "message": "Metrics summary", **snapshot}))
+
+
+class FileSink:
+    """Append each snapshot as a JSON line to a file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, snapshot):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+
+class MetricsFlusher:
+    """Background thread that flushes registry summaries on a fixed interval"""
+
+    def __init__(self, registry, sink=json_log_sink, interval=10.0):
+        self.registry = registry
+        self.sink = sink
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+        self._last_counters = {}
+        self._last_flush = time.monotonic()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and emit one final summary so nothing is lost"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def flush(self):
+        now = time.monotonic()
+        snapshot = self.registry.snapshot()
+        elapsed = max(now - self._last_flush, 1e-9)
+        # Counters are cumulative; add per-second rates since the last flush
+        snapshot["rates"] = {
+            name: round((value - self._last_counters.get(name, 0)) / elapsed, 3)
+            for name, value in snapshot["counters"].items()
+        }
+        snapshot["timestamp"] = time.time()
+        self._last_counters = dict(snapshot["counters"])
+        self._last_flush = now
+        self.sink(snapshot)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+
+    # Example 1: Recording Per-Step Training Metrics
+    # Thousands of observations collapse into a handful of summary lines
+    print("=== Aggregated Training Metrics ===")
+    registry = MetricsRegistry()
+    steps = registry.counter("train.steps")
+    step_time = registry.histogram("train.step_time_s")
+    loss = registry.histogram("train.loss", buckets=[0.05 * i for i in range(1, 41)])
+    lr = registry.gauge("train.learning_rate")
+
+    def training_worker(worker_id, n_steps):
+        """Simulate a data-parallel worker reporting per-step metrics"""
+        for step in range(n_steps):
+            steps.inc()
+            step_time.observe(random.uniform(0.001, 0.01))
+            loss.observe(max(0.01, 2.0 * (1 - step / n_steps) + random.gauss(0, 0.05)))
+            lr.set(0.01 * (0.999 ** step))
+
+    with MetricsFlusher(registry, interval=0.2):
+        workers = [threading.Thread(target=training_worker, args=(i, 20000)) for i in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Flushing to a File
+    # Summaries go to a JSON-lines file for later shipping/analysis
+    print("=== File Sink ===")
+    sink_dir = tempfile.mkdtemp()
+    sink = FileSink(os.path.join(sink_dir, "metrics.jsonl"))
+    flusher = MetricsFlusher(registry, sink=sink, interval=60)
+    flusher.flush()
+    print(f"Wrote summary to {sink.path} ({os.path.getsize(sink.path)} bytes)")
+    shutil.rmtree(sink_dir, ignore_errors=True)
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Measuring Recording Overhead
+    # Compare the hot-path cost against emitting one JSON line per event
+    print("=== Recording Overhead ===")
+    n = 200_000
+    bench = MetricsRegistry()
+    counter = bench.counter("bench.counter")
+    histogram = bench.histogram("bench.histogram")
+
+    start = time.perf_counter()
+    for _ in range(n):
+        counter.inc()
+    counter_ns = (time.perf_counter() - start) / n * 1e9
+
+    start = time.perf_counter()
+    for i in range(n):
+        histogram.observe(i * 1e-6)
+    histogram_ns = (time.perf_counter() - start) / n * 1e9
+
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        for i in range(n):
+            devnull.write(json.dumps({"level": "INFO", "message": "step", "loss": i * 1e-6}) + "\n")
+        json_line_ns = (time.perf_counter() - start) / n * 1e9
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        bench.snapshot()
+    snapshot_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(f"Counter.inc():         {counter_ns:8.0f} ns/op")
+    print(f"Histogram.observe():   {histogram_ns:8.0f} ns/op")
+    print(f"json.dumps per event:  {json_line_ns:8.0f} ns/op (written to /dev/null)")
+    print(f"registry.snapshot():   {snapshot_us:8.1f} us/op")
+
+    print("\n=== Metrics Aggregation Benefits in MLOps ===")
+    print("- Per-step metrics cost a few hundred nanoseconds, not a log line")
+    print("- Per-thread shards keep data-parallel workers lock-free on the hot path")
+    print("- Interval summaries (count, mean, p50/p90/p99) replace gigabytes of logs")
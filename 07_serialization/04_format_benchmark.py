@@ -0,0 +1,325 @@
+#!/usr/bin/python3
+"""
+Serialization Format Benchmark for MLOps
+Runnable suite that writes and reads synthetic tabular and numeric
+datasets in several formats and reports write/read throughput,
+peak memory and on-disk size, so formats are chosen from evidence
+
+Run with:
+    python 07_serialization/04_format_benchmark.py --rows 1e4 1e5 1e6 --json results.json
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import h5py
+import numpy as np
+import pandas as pd
+
+# Reuse chunk-shape and filter selection from the HDF5 store example
+hdf5_store = importlib.import_module("03_chunked_hdf5_store")
+
+NUMERIC_FEATURES = 16
+
+
+# Synthetic datasets ----------------------------------------------------------
+
+def make_tabular(n_rows, seed=0):
+    """Mixed-type frame resembling model predictions joined with metadata"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(n_rows, dtype="int64"),
+        "score": rng.random(n_rows),
+        "label": rng.integers(0, 2, n_rows, dtype="int8"),
+        "model": pd.Categorical(rng.choice(["baseline", "candidate", "champion"], n_rows)),
+        "latency_ms": rng.gamma(2.0, 5.0, n_rows).astype("float32"),
+    })
+
+
+def make_numeric(n_rows, seed=0):
+    """Dense float32 feature matrix with limited precision (like real features)"""
+    rng = np.random.default_rng(seed)
+    return np.round(rng.normal(size=(n_rows, NUMERIC_FEATURES)), 3).astype("float32")
+
+
+def nbytes(data):
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True).sum())
+    return data.nbytes
+
+
+# Format writers / readers ----------------------------------------------------
+
+def _pickle_write(data, path):
+    with open(path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _pickle_read(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _parquet(codec):
+    return (lambda df, path: df.to_parquet(path, compression=codec, index=False),
+            pd.read_parquet)
+
+
+def _feather(codec):
+    return (lambda df, path: df.to_feather(path, compression=codec),
+            pd.read_feather)
+
+
+def _hdf5(compression):
+    def write(arr, path):
+        chunks = hdf5_store.choose_chunk_shape(arr.shape, arr.dtype.itemsize, "row")
+        with h5py.File(path, "w") as f:
+            f.create_dataset("data", data=arr, chunks=chunks,
+                             **hdf5_store.compression_kwargs(compression))
+
+    def read(path):
+        with h5py.File(path, "r") as f:
+            return f["data"][:]
+    return write, read
+
+
+def _memmap_read(path):
+    # A memmap read is lazy; touching every page makes it comparable to a full load
+    arr = np.load(path, mmap_mode="r")
+    arr.sum()
+    return arr
+
+
+FORMATS = {
+    "tabular": {
+        "parquet-snappy": _parquet("snappy"),
+        "parquet-zstd": _parquet("zstd"),
+        "parquet-gzip": _parquet("gzip"),
+        "parquet-none": _parquet(None),
+        "feather-lz4": _feather("lz4"),
+        "feather-zstd": _feather("zstd"),
+        "feather-none": _feather("uncompressed"),
+        "pickle": (_pickle_write, _pickle_read),
+    },
+    "numeric": {
+        "npy": (lambda arr, path: np.save(path, arr), np.load),
+        "npy-memmap": (lambda arr, path: np.save(path, arr), _memmap_read),
+        "hdf5-none": _hdf5(None),
+        "hdf5-lzf": _hdf5("lzf"),
+        "hdf5-gzip": _hdf5("gzip"),
+        "pickle": (_pickle_write, _pickle_read),
+    },
+}
+
+# np.save appends .npy when the suffix is missing, so give every format a suffix
+SUFFIXES = {"npy": ".npy", "hdf5": ".h5", "parquet": ".parquet", "feather": ".arrow",
+            "pickle": ".pkl"}
+
+
+# Measurement helpers ---------------------------------------------------------
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class PeakMemory:
+    """
+    Peak memory growth during a block
+
+    Samples process RSS on Linux (captures Arrow/HDF5 native buffers that
+    tracemalloc cannot see); falls back to tracemalloc elsewhere. Only
+    meaningful in a process that has not run other cases (see run_suite).
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._use_rss = os.path.exists("/proc/self/statm")
+
+    def __enter__(self):
+        gc.collect()
+        if self._use_rss:
+            self._baseline = self._peak = _rss_bytes()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            tracemalloc.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _rss_bytes())
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._use_rss:
+            self._stop.set()
+            self._thread.join()
+            self._peak = max(self._peak, _rss_bytes())
+            self.peak_bytes = self._peak - self._baseline
+        else:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def warm_up(dataset, fmt, data, workdir):
+    """
+    Throwaway write/read of a small slice before measuring
+
+    Lazy imports and first-call setup inside pandas/pyarrow/h5py would
+    otherwise be counted in the first size's peak memory and timings.
+    """
+    write, read = FORMATS[dataset][fmt]
+    sample = data.iloc[:1000] if isinstance(data, pd.DataFrame) else data[:1000]
+    path = os.path.join(workdir, f"warmup-{dataset}-{fmt}{SUFFIXES[fmt.split('-')[0]]}")
+    write(sample, path)
+    read(path)
+    os.remove(path)
+
+
+def run_one(dataset, fmt, data, workdir, repeats):
+    """Benchmark one format on one dataset; keep the best of `repeats` timings"""
+    write, read = FORMATS[dataset][fmt]
+    path = os.path.join(workdir, f"{dataset}-{fmt}{SUFFIXES[fmt.split('-')[0]]}")
+    write_s = read_s = float("inf")
+    write_peak = read_peak = 0
+
+    for _ in range(repeats):
+        if os.path.exists(path):
+            os.remove(path)
+        with PeakMemory() as mem:
+            start = time.perf_counter()
+            write(data, path)
+            write_s = min(write_s, time.perf_counter() - start)
+        write_peak = max(write_peak, mem.peak_bytes)
+
+        with PeakMemory() as mem:
+            start = time.perf_counter()
+            loaded = read(path)
+            read_s = min(read_s, time.perf_counter() - start)
+        read_peak = max(read_peak, mem.peak_bytes)
+        del loaded
+
+    raw = nbytes(data)
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {
+        "dataset": dataset,
+        "rows": len(data),
+        "format": fmt,
+        "raw_mb": round(raw / 1e6, 2),
+        "size_mb": round(size / 1e6, 2),
+        "ratio": round(raw / size, 2),
+        "write_s": round(write_s, 4),
+        "read_s": round(read_s, 4),
+        "write_mb_s": round(raw / 1e6 / write_s, 1),
+        "read_mb_s": round(raw / 1e6 / read_s, 1),
+        "write_peak_mb": round(write_peak / 1e6, 1),
+        "read_peak_mb": round(read_peak / 1e6, 1),
+    }
+
+
+# Each case runs in a fresh interpreter: Arrow's memory pool and the allocator keep
+# memory from earlier cases, which would make later formats under-report their peak
+
+def _run_case(dataset, fmt, n_rows, repeats, workdir):
+    data = make_tabular(n_rows) if dataset == "tabular" else make_numeric(n_rows)
+    warm_up(dataset, fmt, data, workdir)
+    return run_one(dataset, fmt, data, workdir, repeats)
+
+
+def run_suite(row_counts, datasets=("tabular", "numeric"), formats=None, repeats=3,
+              workdir=None):
+    """Run every selected (dataset, format, size) combination, each in its own process"""
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="format-bench-")
+    results = []
+    try:
+        for n_rows in row_counts:
+            for dataset in datasets:
+                for fmt in FORMATS[dataset]:
+                    if formats and fmt not in formats:
+                        continue
+                    proc = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--case", dataset, fmt,
+                         str(n_rows), "--repeats", str(repeats), "--dir", workdir],
+                        capture_output=True, text=True)
+                    if proc.returncode != 0:
+                        # e.g. a missing optional codec (ImportError) in the child
+                        error = proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+                        print(f"Skipping {dataset}/{fmt} at {n_rows} rows: {error}")
+                        continue
+                    result = json.loads(proc.stdout)
+                    results.append(result)
+                    print(format_row(result), flush=True)
+    finally:
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+COLUMNS = [("dataset", 8), ("rows", 11), ("format", 15), ("size_mb", 9), ("ratio", 6),
+           ("write_mb_s", 11), ("read_mb_s", 10), ("write_peak_mb", 14), ("read_peak_mb", 13)]
+
+
+def format_header():
+    header = " ".join(f"{name:>{width}}" for name, width in COLUMNS)
+    return header + "\n" + "-" * len(header)
+
+
+def format_row(result):
+    return " ".join(f"{result[name]:>{width}}" for name, width in COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ML serialization formats")
+    parser.add_argument("--rows", nargs="+", type=float, default=[1e4, 1e5, 1e6],
+                        help="Row counts to test (1e4 .. 1e8)")
+    parser.add_argument("--datasets", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--formats", nargs="+", help="Subset of formats (default: all)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--dir", help="Directory for benchmark files (default: temp dir)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--case", nargs=3, metavar=("DATASET", "FORMAT", "ROWS"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:  # child process started by run_suite
+        dataset, fmt, n_rows = args.case
+        print(json.dumps(_run_case(dataset, fmt, int(n_rows), args.repeats, args.dir)))
+        return None
+
+    print("=== Serialization Format Benchmark ===")
+    print(format_header())
+    results = run_suite([int(n) for n in args.rows], args.datasets, args.formats,
+                        args.repeats, args.dir)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return results
+
+
+if __name__ == "__main__":
+    if "--case" in sys.argv:
+        main()  # one benchmark case in a child process
+        sys.exit(0)
+    main()
+
+    print("\n=== Reading the Results ===")
+    print("- size_mb / ratio: storage and network cost of the format")
+    print("- write/read MB/s: throughput relative to the in-memory size")
+    print("- *_peak_mb: extra memory needed while writing or reading")
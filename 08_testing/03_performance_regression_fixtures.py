@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+"""
+Performance Regression Testing with pytest Fixtures
+Demonstrates fixtures that time hot paths with warm-up and repeated
+rounds, track peak memory with tracemalloc, and fail the test when
+results regress beyond a tolerance against a stored JSON baseline
+
+Run with:
+    PERF_UPDATE_BASELINE=1 python -m pytest ...   # record baselines on this machine
+    python -m pytest 08_testing/03_performance_regression_fixtures.py -v -s
+
+Benchmarks without a stored baseline are skipped, never silently passed;
+in CI, restore the baseline file from a cache or point PERF_BASELINE at it
+"""
+
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+import pytest
+
+# Configuration comes from the environment so CI can tune it without code changes
+BASELINE_PATH = os.environ.get(
+    "PERF_BASELINE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json")
+)
+TIME_TOLERANCE = float(os.environ.get("PERF_TIME_TOLERANCE", "0.25"))     # +25% allowed
+MEMORY_TOLERANCE = float(os.environ.get("PERF_MEMORY_TOLERANCE", "0.10"))  # +10% allowed
+UPDATE_BASELINE = os.environ.get("PERF_UPDATE_BASELINE") == "1"
+
+# Example 1: Timing and Memory Measurement
+# One measurement object per benchmark: timed rounds, then one traced round
+print("=== Performance Measurement Example ===")
+
+
+class PerfResult:
+    """Timings (seconds) and peak traced memory (bytes) for one benchmark"""
+
+    def __init__(self, name, timings, peak_memory):
+        self.name = name
+        self.timings = timings
+        self.peak_memory = peak_memory
+
+    @property
+    def median(self):
+        return statistics.median(self.timings)
+
+    @property
+    def minimum(self):
+        return min(self.timings)
+
+    def to_dict(self):
+        return {"median_s": self.median, "min_s": self.minimum,
+                "peak_memory_bytes": self.peak_memory, "rounds": len(self.timings)}
+
+    def __str__(self):
+        return (f"{self.name}: median {self.median * 1e3:.3f} ms, "
+                f"min {self.minimum * 1e3:.3f} ms, peak {self.peak_memory / 1024:.1f} KiB")
+
+
+def measure(name, func, *args, warmup=2, rounds=10, **kwargs):
+    """
+    Time func(*args, **kwargs) with warm-up, then measure peak memory
+
+    Memory is traced in a separate round because tracemalloc slows
+    allocation-heavy code and would distort the timings.
+    """
+    for _ in range(warmup):
+        func(*args, **kwargs)  # fill caches, trigger lazy imports, JIT-like warm-up
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # GC pauses are a major source of timing noise
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return PerfResult(name, timings, peak_memory)
+
+
+print("\n" + "="*50 + "\n")
+
+# Example 2: Baseline Fixture (session scope)
+# Loaded once per test session; with PERF_UPDATE_BASELINE=1, entries are written at the end
+print("=== Baseline Fixture Example ===")
+
+
+@pytest.fixture(scope="session")
+def perf_baseline():
+    """Stored baseline results, keyed by benchmark name"""
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    else:
+        baseline = {}
+    original = json.dumps(baseline, sort_keys=True)
+
+    yield baseline
+
+    # Teardown: persist new/updated entries only if something changed
+    if json.dumps(baseline, sort_keys=True) != original:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nTeardown: wrote performance baseline to {BASELINE_PATH}")
+
+
+print("\n" + "="*50 + "\n")
+
+# Example 3: Regression-Checking Fixture
+# Tests call perf(name, func, ...) and fail automatically on regression
+print("=== Regression Check Fixture Example ===")
+
+
+class PerfChecker:
+    """
+    Measures a benchmark and compares it against the stored baseline
+
+    Calls may pass time_tolerance= to override the default for a
+    benchmark that is noisier than the rest (e.g. very short calls).
+    """
+
+    def __init__(self, baseline, time_tolerance, memory_tolerance, update):
+        self.baseline = baseline
+        self.time_tolerance = time_tolerance
+        self.memory_tolerance = memory_tolerance
+        self.update = update
+
+    def __call__(self, name, func, *args, warmup=2, rounds=10, time_tolerance=None, **kwargs):
+        time_tolerance = self.time_tolerance if time_tolerance is None else time_tolerance
+        result = measure(name, func, *args, warmup=warmup, rounds=rounds, **kwargs)
+        print(f"\n{result}")
+
+        if self.update:
+            self.baseline[name] = result.to_dict()
+            return result
+        stored = self.baseline.get(name)
+        if stored is None:
+            # Recording here would let every fresh CI checkout pass unchecked
+            pytest.skip(f"No baseline for '{name}' in {BASELINE_PATH}; "
+                        f"run with PERF_UPDATE_BASELINE=1 to record one")
+
+        failures = []
+        time_limit = stored["median_s"] * (1 + time_tolerance)
+        if result.median > time_limit:
+            failures.append(f"median time {result.median * 1e3:.3f} ms > "
+                            f"{time_limit * 1e3:.3f} ms (baseline {stored['median_s'] * 1e3:.3f} ms "
+                            f"+{time_tolerance:.0%})")
+        memory_limit = stored["peak_memory_bytes"] * (1 + self.memory_tolerance)
+        if result.peak_memory > memory_limit:
+            failures.append(f"peak memory {result.peak_memory} B > {memory_limit:.0f} B "
+                            f"(baseline {stored['peak_memory_bytes']} B "
+                            f"+{self.memory_tolerance:.0%})")
+        if failures:
+            pytest.fail(f"Performance regression in '{name}': " + "; ".join(failures))
+        return result
+
+
+@pytest.fixture
+def perf(perf_baseline):
+    """Fixture that benchmarks a callable and fails the test on regression"""
+    return PerfChecker(perf_baseline, TIME_TOLERANCE, MEMORY_TOLERANCE, UPDATE_BASELINE)
+
+
+# Hot paths under guard (stand-ins for metric computation, readers, serializers)
+def f1_score(y_true, y_pred):
+    """Binary F1 score (same computation as the f1score plugin)"""
+    tp = sum(1 for t, p in zip(y_true, y_pred) if t == 1 and p == 1)
+    fp = sum(1 for t, p in zip(y_true, y_pred) if t == 0 and p == 1)
+    fn = sum(1 for t, p in zip(y_true, y_pred) if t == 1 and p == 0)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def read_lines(path):
+    """Line-by-line reader (e.g. parsing a prediction log)"""
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def test_f1_score_performance(perf):
+    """Metric computation must not get slower or hungrier than the baseline"""
+    y_true = [i % 2 for i in range(50_000)]
+    y_pred = [(i // 3) % 2 for i in range(50_000)]
+    result = perf("metrics.f1_score.50k", f1_score, y_true, y_pred)
+    assert result.median > 0
+
+
+def test_json_serializer_performance(perf):
+    """Serializing a prediction payload stays within budget"""
+    payload = {"predictions": [{"id": i, "score": i / 1000} for i in range(5_000)]}
+    # A few ms per call: scheduler noise is a large share, so take a longer
+    # median and allow more headroom than the default
+    perf("serializers.json_dumps.5k", json.dumps, payload, rounds=50, time_tolerance=0.5)
+
+
+def test_file_reader_performance(perf, tmp_path):
+    """File reader throughput on a fixed-size input"""
+    path = tmp_path / "predictions.log"
+    path.write_text("".join(f"{i},{i / 1000}\n" for i in range(100_000)))
+    perf("readers.read_lines.100k", read_lines, str(path))
+
+
+print("\n=== Performance Fixture Benefits ===")
+print("- Plain pytest: no extra plugins needed in CI")
+print("- Warm-up and repeated rounds make timings stable enough to compare")
+print("- Stored baselines turn slowdowns and memory growth into test failures")
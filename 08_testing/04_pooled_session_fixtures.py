@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+"""
+Session-Scoped and Pooled pytest Fixtures for MLOps Testing
+Demonstrates paying expensive setup (model loading, dataset building,
+database connections) once per session or worker, handing out pooled
+resources to tests, and isolating temp directories per parallel worker
+
+Run with:
+    python -m pytest 08_testing/04_pooled_session_fixtures.py -v -s
+    python -m pytest 08_testing/04_pooled_session_fixtures.py -n 4   # with pytest-xdist
+"""
+
+import json
+import os
+import queue
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+
+SETUP_SECONDS = 0.2  # simulated cost of building one expensive resource
+POOL_SIZE = 2
+
+# Example 1: Resource Pool
+# N resources are built once (in parallel) and leased to tests one at a time
+print("=== Resource Pool Example ===")
+
+
+class FakeConnection:
+    """Stand-in for an expensive resource such as a DB connection or loaded model"""
+
+    def __init__(self, conn_id):
+        time.sleep(SETUP_SECONDS)  # simulate slow connect / model load
+        self.conn_id = conn_id
+        self.queries = []
+        self.closed = False
+
+    def execute(self, sql):
+        self.queries.append(sql)
+        return [("ok",)]
+
+    def reset(self):
+        """Clear per-test state so the next lessee starts clean"""
+        self.queries.clear()
+
+    def close(self):
+        self.closed = True
+
+
+class ResourcePool:
+    """Fixed-size pool of pre-built resources handed out and returned"""
+
+    def __init__(self, factory, size, reset=None, teardown=None):
+        self._reset = reset
+        self._teardown = teardown
+        self._idle = queue.Queue()
+        # Build all resources concurrently: setup cost is max(), not sum()
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            self._all = list(executor.map(factory, range(size)))
+        for resource in self._all:
+            self._idle.put(resource)
+
+    @contextmanager
+    def lease(self, timeout=30):
+        """Borrow a resource; it is reset and returned even if the test fails"""
+        try:
+            resource = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No pooled resource available within {timeout}s") from None
+        try:
+            yield resource
+        finally:
+            if self._reset is not None:
+                self._reset(resource)
+            self._idle.put(resource)
+
+    def close(self):
+        if self._teardown is not None:
+            for resource in self._all:
+                self._teardown(resource)
+
+
+print("\n" + "="*50 + "\n")
+
+# Example 2: Worker Identity and Per-Worker Directories
+# pytest-xdist sets PYTEST_XDIST_WORKER (gw0, gw1, ...); plain pytest runs as "main"
+print("=== Per-Worker Isolation Example ===")
+
+
+@pytest.fixture(scope="session")
+def worker_id():
+    """Identifier of the current test process"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+@pytest.fixture(scope="session")
+def worker_tmp_dir(tmp_path_factory, worker_id):
+    """Private scratch directory per worker, shared by all of its tests"""
+    return tmp_path_factory.mktemp(f"worker-{worker_id}")
+
+
+@pytest.fixture(scope="session")
+def shared_cache_dir():
+    """
+    Directory shared by ALL workers (e.g. a downloaded dataset cache)
+
+    Lives outside the per-worker basetemp so workers can reuse each other's work.
+    """
+    path = os.path.join(tempfile.gettempdir(), "mlops-test-cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def build_once(path, builder):
+    """
+    Build an artifact once across parallel workers
+
+    Each builder writes to a private temp file and atomically renames it into
+    place, so concurrent workers never observe a half-written artifact.
+    Losing a race only wastes work; it never corrupts the result.
+    """
+    if not os.path.exists(path):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                builder(f)
+            os.replace(tmp, path)  # atomic on POSIX and Windows
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return path
+
+
+print("\n" + "="*50 + "\n")
+
+# Example 3: Session-Scoped and Pooled Fixtures
+print("=== Session and Pooled Fixtures Example ===")
+
+
+@pytest.fixture(scope="session")
+def db_pool():
+    """POOL_SIZE connections built once per session (i.e. once per xdist worker)"""
+    start = time.perf_counter()
+    pool = ResourcePool(FakeConnection, POOL_SIZE, reset=FakeConnection.reset,
+                        teardown=FakeConnection.close)
+    print(f"\nSetup: built {POOL_SIZE} connections in {time.perf_counter() - start:.2f}s")
+
+    yield pool
+
+    pool.close()
+    print("\nTeardown: closed pooled connections")
+
+
+@pytest.fixture
+def pooled_db_connection(db_pool):
+    """Function-scoped lease: each test gets a clean connection without reconnecting"""
+    with db_pool.lease() as conn:
+        yield conn
+
+
+@pytest.fixture(scope="session")
+def feature_dataset(shared_cache_dir):
+    """Expensive dataset built once across all workers, loaded once per worker"""
+    def build(f):
+        time.sleep(SETUP_SECONDS)  # simulate featurization
+        json.dump([{"id": i, "feature": i * 0.5} for i in range(1000)], f)
+
+    path = build_once(os.path.join(shared_cache_dir, "features-v1.json"), build)
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_pooled_query(pooled_db_connection):
+    """Test using a leased connection"""
+    result = pooled_db_connection.execute("SELECT 1")
+    assert result == [("ok",)]
+    assert pooled_db_connection.queries == ["SELECT 1"]
+
+
+def test_pooled_connection_is_reset(pooled_db_connection):
+    """A connection returned by an earlier test arrives without its queries"""
+    assert pooled_db_connection.queries == []
+    assert not pooled_db_connection.closed
+
+
+@pytest.mark.parametrize("row", [0, 10, 999])
+def test_feature_dataset(feature_dataset, row):
+    """Many tests share one dataset build"""
+    assert feature_dataset[row]["feature"] == row * 0.5
+
+
+def test_worker_tmp_dir_is_private(worker_tmp_dir, worker_id):
+    """Files written here cannot collide with other workers' files"""
+    output = worker_tmp_dir / "model.bin"
+    output.write_bytes(b"weights")
+    assert worker_id in worker_tmp_dir.name
+    assert output.read_bytes() == b"weights"
+
+
+print("\n=== Pooled Fixture Benefits ===")
+print("- Expensive setup runs once per session/worker instead of once per test")
+print("- Pools hand out N ready resources and reset them between tests")
+print("- Per-worker directories and atomic builds keep parallel runs collision-free")
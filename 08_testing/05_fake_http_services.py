@@ -0,0 +1,289 @@
+#!/usr/bin/python3
+"""
+Latency-Injecting Fake Services for MLOps Testing
+Demonstrates a fake HTTP backend with configurable latency
+distributions, error rates, throttling (429) and bandwidth caps that
+records per-call timings, usable as a requests patch or as a local
+in-process server, so concurrent fetch code can be benchmarked offline
+"""
+
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+# Example 1: Latency Distributions
+# Each returns a callable that draws one delay (seconds) from a random generator
+print("=== Latency Distributions ===")
+
+
+def constant(seconds):
+    return lambda rng: seconds
+
+
+def uniform(low, high):
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median, sigma=0.5):
+    """Long-tailed latency, typical of real services (median plus occasional slow calls)"""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+print("constant(0.05), uniform(0.01, 0.1), lognormal(0.05, sigma=0.5)")
+print("\n" + "="*50 + "\n")
+
+# Example 2: Fake Backend
+# One object models the service; patch() and serve() are two ways to reach it
+print("=== Fake HTTP Backend ===")
+
+
+class CallRecord:
+    """Timing of one call against the fake backend"""
+
+    def __init__(self, method, url, status, start, duration, nbytes, in_flight):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.start = start
+        self.duration = duration
+        self.nbytes = nbytes
+        self.in_flight = in_flight  # concurrent calls when this one started
+
+
+class FakeResponse:
+    """Minimal requests.Response look-alike returned in patch mode"""
+
+    def __init__(self, status, headers, body, url):
+        self.status_code = status
+        self.headers = headers
+        self.content = body
+        self.url = url
+        self.ok = status < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            from requests import HTTPError  # patch mode implies requests is installed
+            raise HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class FakeHTTPBackend:
+    """
+    Fake service with realistic latency, failures, throttling and bandwidth
+
+    Args:
+        routes: Mapping of path -> response body (bytes, str or JSON-able);
+            unknown paths return 404
+        latency: Latency distribution (see constant/uniform/lognormal)
+        error_rate: Fraction of calls answered with error_status
+        rate_limit: Requests per second before answering 429 (None = unlimited)
+        burst: Token-bucket burst size for rate_limit
+        bandwidth: Shared link capacity in bytes/s (None = unlimited);
+            concurrent responses queue for the link like a real pipe
+        seed: Random seed for reproducible runs
+    """
+
+    def __init__(self, routes=None, latency=constant(0.0), error_rate=0.0, error_status=503,
+                 rate_limit=None, burst=None, bandwidth=None, seed=0):
+        self.routes = routes or {}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.burst = burst or (rate_limit or 1)
+        self.bandwidth = bandwidth
+        self.calls = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._link_free_at = 0.0
+        self._in_flight = 0
+
+    def handle(self, method, url):
+        """Serve one call, sleeping to simulate latency and transfer time"""
+        start = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            in_flight = self._in_flight
+            delay = self.latency(self._rng)
+            failed = self._rng.random() < self.error_rate
+            throttled = self.rate_limit is not None and not self._take_token(start)
+            # Seconds until the bucket holds a whole token again
+            refill_wait = (1 - self._tokens) / self.rate_limit if throttled else 0.0
+
+        status, body = 599, b""  # recorded if the handler itself fails
+        try:
+            time.sleep(delay)
+            if throttled:
+                # Retry-After must be integer delay-seconds (RFC 9110), or clients such
+                # as urllib3's Retry reject the header
+                retry_after = str(max(1, math.ceil(refill_wait)))
+                status, headers, body = 429, {"Retry-After": retry_after}, b""
+            elif failed:
+                status, headers, body = self.error_status, {}, b""
+            else:
+                status, headers, body = self._route(urlsplit(url).path)
+            self._transfer(len(body))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.calls.append(CallRecord(method, url, status, start,
+                                             time.monotonic() - start, len(body), in_flight))
+        return status, headers, body
+
+    def _take_token(self, now):
+        """Token bucket: refill at rate_limit/s up to burst (caller holds the lock)"""
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_limit)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _transfer(self, nbytes):
+        """Reserve time on the shared link so concurrent downloads split bandwidth"""
+        if not self.bandwidth or not nbytes:
+            return
+        with self._lock:
+            start = max(time.monotonic(), self._link_free_at)
+            self._link_free_at = start + nbytes / self.bandwidth
+            done_at = self._link_free_at
+        time.sleep(max(0.0, done_at - time.monotonic()))
+
+    def _route(self, path):
+        if path not in self.routes:
+            return 404, {}, b"not found"
+        body = self.routes[path]
+        if isinstance(body, bytes):
+            return 200, {"Content-Type": "application/octet-stream"}, body
+        if isinstance(body, str):
+            return 200, {"Content-Type": "text/plain"}, body.encode("utf-8")
+        return 200, {"Content-Type": "application/json"}, json.dumps(body).encode("utf-8")
+
+    def stats(self):
+        """Summary of recorded calls: status counts, latency percentiles, concurrency"""
+        with self._lock:
+            calls = list(self.calls)
+        if not calls:
+            return {"calls": 0}
+        durations = sorted(c.duration for c in calls)
+        statuses = {}
+        for c in calls:
+            statuses[c.status] = statuses.get(c.status, 0) + 1
+        return {
+            "calls": len(calls),
+            "statuses": statuses,
+            "p50_s": round(statistics.median(durations), 4),
+            "p95_s": round(durations[int(0.95 * (len(durations) - 1))], 4),
+            "max_s": round(durations[-1], 4),
+            "max_in_flight": max(c.in_flight for c in calls),
+            "bytes": sum(c.nbytes for c in calls),
+        }
+
+    @contextmanager
+    def patch(self, target="requests.get"):
+        """Route requests.get (or another callable) through the fake backend"""
+        def fake_call(url, *args, **kwargs):
+            return FakeResponse(*self.handle("GET", url), url)
+
+        with patch(target, side_effect=fake_call) as mock:
+            yield mock
+
+    @contextmanager
+    def serve(self, host="127.0.0.1", port=0):
+        """Run a real local HTTP server backed by this fake; yields its base URL"""
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = backend.handle("GET", self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # keep benchmark output clean
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{server.server_address[1]}"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.error import HTTPError
+    from urllib.request import urlopen
+
+    def fetch(url):
+        """Code under test: fetch one resource, returning its status code"""
+        try:
+            with urlopen(url, timeout=10) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            return e.code
+
+    # In-process server: exercise real sockets with 20 concurrent clients
+    backend = FakeHTTPBackend(
+        routes={f"/shard/{i}": b"x" * 50_000 for i in range(100)},
+        latency=lognormal(0.02, sigma=0.6),
+        error_rate=0.05,
+        rate_limit=200, burst=50,
+        bandwidth=20_000_000,  # 20 MB/s shared link
+    )
+    with backend.serve() as base_url:
+        urls = [f"{base_url}/shard/{i}" for i in range(100)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            statuses = list(executor.map(fetch, urls))
+        elapsed = time.perf_counter() - start
+
+    print(f"Fetched {len(urls)} shards with 20 threads in {elapsed:.2f}s")
+    print(f"Backend stats: {backend.stats()}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Patch Mode
+    # Same fake, no sockets: patches requests.get like 02_mocks_and_patches.py
+    print("=== Patch Mode ===")
+
+    def fetch_data():
+        """Function that fetches data from external API"""
+        import requests
+        return requests.get("https://example.com/health").status_code
+
+    backend = FakeHTTPBackend(routes={"/health": {"status": "ok"}}, latency=constant(0.05))
+    try:
+        with backend.patch("requests.get"):
+            result = fetch_data()
+        print(f"Patched call returned {result} after {backend.calls[0].duration:.3f}s")
+    except ImportError:
+        print("requests not installed - patch mode needs the requests library")
+
+    print("\n=== Fake Service Benefits ===")
+    print("- Benchmark concurrent client code offline with realistic latency")
+    print("- Exercise retry/backoff paths with injected errors and 429s")
+    print("- Per-call timings show queuing, throttling and bandwidth limits")
@@ -24,7 +24,8 @@ try:
         detach=True
     )
     
-    # Get container logs
+    # Wait for the command to finish so no output is missed, then get logs
+    container.wait()
     logs = container.logs()
     print(f"Container logs: {logs.decode('utf-8').strip()}")
     
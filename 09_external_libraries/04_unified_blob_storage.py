@@ -0,0 +1,569 @@
+#!/usr/bin/python3
+"""
+Unified Blob Storage for MLOps
+Demonstrates one storage interface (put/get/list/stream) over S3, GCS,
+Azure Blob and the local filesystem, with large objects split into
+parts transferred concurrently from a thread pool and downloads
+streamed straight to disk instead of buffered in memory
+"""
+
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MiB = 1024 * 1024
+
+
+class TransferConfig:
+    """Multipart transfer tuning shared by every backend"""
+
+    def __init__(self, part_size=8 * MiB, multipart_threshold=16 * MiB, max_concurrency=8):
+        self.part_size = part_size
+        self.multipart_threshold = multipart_threshold
+        self.max_concurrency = max_concurrency
+
+
+class BlobStore:
+    """
+    Base class for all storage backends
+
+    Subclasses implement a few primitives (single-shot put, multipart
+    begin/part/complete, ranged read, stat, one listing page); the base class
+    turns them into concurrent multipart uploads, parallel ranged downloads
+    and listings that follow continuation tokens.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or TransferConfig()
+
+    # Public API ---------------------------------------------------------------
+
+    def put(self, key, path):
+        """Upload a local file; large files go up as concurrent parts"""
+        size = os.path.getsize(path)
+        if size < self.config.multipart_threshold:
+            with open(path, "rb") as f:
+                self._put_object(key, f.read())
+            return size
+
+        part_size = self.config.part_size
+        ranges = [(number, offset, min(part_size, size - offset))
+                  for number, offset in enumerate(range(0, size, part_size), start=1)]
+        upload = self._begin_multipart(key)
+        try:
+            with ThreadPoolExecutor(max_workers=self.config.max_concurrency) as executor:
+                # Each task reads its own part, so memory is bounded by
+                # max_concurrency * part_size regardless of file size
+                parts = list(executor.map(
+                    lambda r: self._upload_part(key, upload, r[0], _read_part(path, r[1], r[2])),
+                    ranges,
+                ))
+            self._complete_multipart(key, upload, parts)
+        except BaseException:
+            self._abort_multipart(key, upload)
+            raise
+        return size
+
+    def get(self, key, path):
+        """Download to a local file with parallel ranged reads written in place"""
+        size = self.stat(key)["size"]
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".part-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.truncate(size)  # preallocate so parts can be written at their offsets
+
+            def fetch(offset):
+                data = self._read_range(key, offset, min(offset + self.config.part_size, size))
+                with open(tmp, "r+b") as out:
+                    out.seek(offset)
+                    out.write(data)
+                return len(data)
+
+            with ThreadPoolExecutor(max_workers=self.config.max_concurrency) as executor:
+                written = sum(executor.map(fetch, range(0, size, self.config.part_size)))
+            if written != size:
+                raise IOError(f"Short download for {key}: {written} of {size} bytes")
+            os.replace(tmp, path)  # readers never see a partially written file
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return size
+
+    def stream(self, key, chunk_size=None):
+        """Yield an object's bytes in sequential chunks without buffering it all"""
+        chunk_size = chunk_size or self.config.part_size
+        size = self.stat(key)["size"]
+        for offset in range(0, size, chunk_size):
+            yield self._read_range(key, offset, min(offset + chunk_size, size))
+
+    def list(self, prefix="", page_size=1000):
+        """Yield {"key", "size", "etag"} dicts under prefix, following continuation tokens"""
+        for objects, _ in self.list_pages(prefix, page_size):
+            yield from objects
+
+    def list_pages(self, prefix="", page_size=1000, start_token=None):
+        """
+        Yield (objects, next_token) one page at a time
+
+        Persisting next_token lets an interrupted listing resume where it stopped.
+        """
+        token = start_token
+        while True:
+            objects, token = self._list_page(prefix, token, page_size)
+            yield objects, token
+            if not token:
+                return
+
+    def list_level(self, prefix="", delimiter="/"):
+        """
+        One "directory level" under prefix (e.g. to shard a listing)
+
+        Returns:
+            tuple: (objects directly under prefix, sorted sub-prefixes)
+        """
+        raise NotImplementedError
+
+    def stat(self, key):
+        """Return {"key", "size", "etag"}; raise FileNotFoundError if missing"""
+        raise NotImplementedError
+
+    def stat_if_modified(self, key, etag):
+        """
+        Conditional stat: None if the object still has this ETag, else its new stat
+
+        Backends override this with a native conditional request (If-None-Match).
+        """
+        current = self.stat(key)
+        return None if current["etag"] == etag else current
+
+    def uri(self, key):
+        """Globally unique location of a key (bucket/container included)"""
+        raise NotImplementedError
+
+    # Backend primitives -------------------------------------------------------
+
+    def _put_object(self, key, data):
+        raise NotImplementedError
+
+    def _begin_multipart(self, key):
+        raise NotImplementedError
+
+    def _upload_part(self, key, upload, number, data):
+        raise NotImplementedError
+
+    def _complete_multipart(self, key, upload, parts):
+        raise NotImplementedError
+
+    def _abort_multipart(self, key, upload):
+        pass
+
+    def _read_range(self, key, start, end):
+        """Bytes [start, end) of the object"""
+        raise NotImplementedError
+
+    def _list_page(self, prefix, token, page_size):
+        """One page of listing results and the token for the next page (None at the end)"""
+        raise NotImplementedError
+
+
+def _read_part(path, offset, length):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+# Local filesystem backend (tests, laptops, shared NFS) -------------------------
+
+class LocalBlobStore(BlobStore):
+    """Blob store rooted at a local directory; keys map to relative paths"""
+
+    def __init__(self, root, config=None):
+        super().__init__(config)
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Key escapes the store root: {key}")
+        return path
+
+    def stat(self, key):
+        path = self._path(key)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No such blob: {key}") from None
+        return {"key": key, "size": st.st_size, "etag": f"{st.st_mtime_ns:x}-{st.st_size:x}"}
+
+    def uri(self, key):
+        return f"file://{self.root}/{key}"
+
+    def _keys(self, prefix):
+        """Sorted keys under prefix, walking only the directory that can contain them"""
+        base = os.path.join(self.root, os.path.dirname(prefix))
+        keys = []
+        for directory, _, files in os.walk(base):
+            for name in files:
+                if name.startswith(".part-") or name.endswith(".upload"):
+                    continue
+                key = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def _list_page(self, prefix, token, page_size):
+        # Like S3 StartAfter: the token is the last key of the previous page
+        keys = [key for key in self._keys(prefix) if token is None or key > token]
+        page = keys[:page_size]
+        next_token = page[-1] if len(keys) > page_size else None
+        return [self.stat(key) for key in page], next_token
+
+    def list_level(self, prefix="", delimiter="/"):
+        objects, prefixes = [], set()
+        for key in self._keys(prefix):
+            head, sep, _ = key[len(prefix):].partition(delimiter)
+            if sep:
+                prefixes.add(prefix + head + delimiter)
+            else:
+                objects.append(self.stat(key))
+        return objects, sorted(prefixes)
+
+    def _put_object(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.upload"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _begin_multipart(self, key):
+        return tempfile.mkdtemp(prefix="multipart-")
+
+    def _upload_part(self, key, upload, number, data):
+        with open(os.path.join(upload, f"{number:06d}"), "wb") as f:
+            f.write(data)
+        return number
+
+    def _complete_multipart(self, key, upload, parts):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.upload"
+        with open(tmp, "wb") as out:
+            for number in sorted(parts):
+                with open(os.path.join(upload, f"{number:06d}"), "rb") as part:
+                    shutil.copyfileobj(part, out, MiB)
+        os.replace(tmp, path)
+        shutil.rmtree(upload, ignore_errors=True)
+
+    def _abort_multipart(self, key, upload):
+        shutil.rmtree(upload, ignore_errors=True)
+
+    def _read_range(self, key, start, end):
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+
+# AWS S3 ------------------------------------------------------------------------
+
+class S3BlobStore(BlobStore):
+    """S3 backend using native multipart upload and ranged GETs (parts >= 5 MiB)"""
+
+    def __init__(self, bucket, client=None, config=None):
+        super().__init__(config)
+        if client is None:
+            import boto3
+            client = boto3.client("s3")
+        self.bucket = bucket
+        self.client = client
+
+    def stat(self, key):
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except self.client.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise FileNotFoundError(f"No such blob: s3://{self.bucket}/{key}") from None
+            raise
+        return {"key": key, "size": head["ContentLength"], "etag": head["ETag"].strip('"')}
+
+    def stat_if_modified(self, key, etag):
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key, IfNoneMatch=f'"{etag}"')
+        except self.client.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] == "304":
+                return None
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise FileNotFoundError(f"No such blob: s3://{self.bucket}/{key}") from None
+            raise
+        return {"key": key, "size": head["ContentLength"], "etag": head["ETag"].strip('"')}
+
+    def uri(self, key):
+        return f"s3://{self.bucket}/{key}"
+
+    def _list_page(self, prefix, token, page_size):
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix, "MaxKeys": page_size}
+        if token:
+            kwargs["ContinuationToken"] = token
+        response = self.client.list_objects_v2(**kwargs)
+        objects = [{"key": obj["Key"], "size": obj["Size"], "etag": obj["ETag"].strip('"')}
+                   for obj in response.get("Contents", [])]
+        return objects, response.get("NextContinuationToken")
+
+    def list_level(self, prefix="", delimiter="/"):
+        objects, prefixes = [], []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter=delimiter):
+            objects += [{"key": obj["Key"], "size": obj["Size"], "etag": obj["ETag"].strip('"')}
+                        for obj in page.get("Contents", [])]
+            prefixes += [common["Prefix"] for common in page.get("CommonPrefixes", [])]
+        return objects, sorted(prefixes)
+
+    def _put_object(self, key, data):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def _begin_multipart(self, key):
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+
+    def _upload_part(self, key, upload, number, data):
+        response = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload,
+                                           PartNumber=number, Body=data)
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    def _complete_multipart(self, key, upload, parts):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=upload,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+        )
+
+    def _abort_multipart(self, key, upload):
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload)
+
+    def _read_range(self, key, start, end):
+        response = self.client.get_object(Bucket=self.bucket, Key=key,
+                                          Range=f"bytes={start}-{end - 1}")
+        return response["Body"].read()
+
+
+# Google Cloud Storage -----------------------------------------------------------
+
+class GCSBlobStore(BlobStore):
+    """GCS backend: parallel composite uploads (parts composed server-side)"""
+
+    MAX_COMPOSE_SOURCES = 32
+
+    def __init__(self, bucket, client=None, config=None):
+        super().__init__(config)
+        if client is None:
+            from google.cloud import storage
+            client = storage.Client()
+        self.bucket = client.bucket(bucket)
+
+    def stat(self, key):
+        blob = self.bucket.get_blob(key)
+        if blob is None:
+            raise FileNotFoundError(f"No such blob: gs://{self.bucket.name}/{key}")
+        return {"key": key, "size": blob.size, "etag": blob.etag, "generation": blob.generation}
+
+    def stat_if_modified(self, key, etag):
+        from google.api_core.exceptions import NotModified
+        try:
+            blob = self.bucket.get_blob(key, if_etag_not_match=etag)
+        except NotModified:
+            return None
+        if blob is None:
+            raise FileNotFoundError(f"No such blob: gs://{self.bucket.name}/{key}")
+        return {"key": key, "size": blob.size, "etag": blob.etag, "generation": blob.generation}
+
+    def uri(self, key):
+        return f"gs://{self.bucket.name}/{key}"
+
+    def _list_page(self, prefix, token, page_size):
+        iterator = self.bucket.list_blobs(prefix=prefix, page_size=page_size, page_token=token)
+        page = next(iterator.pages, [])
+        objects = [{"key": blob.name, "size": blob.size, "etag": blob.etag} for blob in page]
+        return objects, iterator.next_page_token
+
+    def list_level(self, prefix="", delimiter="/"):
+        iterator = self.bucket.list_blobs(prefix=prefix, delimiter=delimiter)
+        # iterator.prefixes is filled in while the pages are consumed
+        objects = [{"key": blob.name, "size": blob.size, "etag": blob.etag} for blob in iterator]
+        return objects, sorted(iterator.prefixes)
+
+    def _put_object(self, key, data):
+        self.bucket.blob(key).upload_from_string(data)
+
+    def _begin_multipart(self, key):
+        return f"{key}.parts-{os.getpid()}-{time.time_ns()}/"
+
+    def _upload_part(self, key, upload, number, data):
+        name = f"{upload}{number:06d}"
+        self.bucket.blob(name).upload_from_string(data)
+        return name
+
+    def _complete_multipart(self, key, upload, parts):
+        parts = [self.bucket.blob(name) for name in sorted(parts)]
+        # compose accepts at most 32 sources: fold parts into intermediate objects
+        while len(parts) > self.MAX_COMPOSE_SOURCES:
+            groups = [parts[i:i + self.MAX_COMPOSE_SOURCES]
+                      for i in range(0, len(parts), self.MAX_COMPOSE_SOURCES)]
+            composed = []
+            for i, group in enumerate(groups):
+                blob = self.bucket.blob(f"{upload}compose-{len(parts)}-{i:06d}")
+                blob.compose(group)
+                composed.append(blob)
+            parts = composed
+        self.bucket.blob(key).compose(parts)
+        self._abort_multipart(key, upload)
+
+    def _abort_multipart(self, key, upload):
+        for blob in self.bucket.list_blobs(prefix=upload):
+            blob.delete()
+
+    def _read_range(self, key, start, end):
+        return self.bucket.blob(key).download_as_bytes(start=start, end=end - 1)
+
+
+# Azure Blob Storage --------------------------------------------------------------
+
+class AzureBlobStore(BlobStore):
+    """Azure backend: staged blocks committed as a block list, ranged downloads"""
+
+    def __init__(self, container, connection_string=None, container_client=None, config=None):
+        super().__init__(config)
+        if container_client is None:
+            from azure.storage.blob import BlobServiceClient
+            service = BlobServiceClient.from_connection_string(connection_string)
+            container_client = service.get_container_client(container)
+        self.container = container_client
+
+    def stat(self, key):
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            props = self.container.get_blob_client(key).get_blob_properties()
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"No such blob: {key}") from None
+        return {"key": key, "size": props.size, "etag": props.etag.strip('"')}
+
+    def stat_if_modified(self, key, etag):
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+        try:
+            props = self.container.get_blob_client(key).get_blob_properties(
+                etag=f'"{etag}"', match_condition=MatchConditions.IfModified)
+        except ResourceNotModifiedError:
+            return None
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"No such blob: {key}") from None
+        return {"key": key, "size": props.size, "etag": props.etag.strip('"')}
+
+    def uri(self, key):
+        return f"az://{self.container.container_name}/{key}"
+
+    def _list_page(self, prefix, token, page_size):
+        pages = self.container.list_blobs(name_starts_with=prefix,
+                                          results_per_page=page_size).by_page(token)
+        page = next(pages, [])
+        objects = [{"key": blob.name, "size": blob.size, "etag": blob.etag.strip('"')}
+                   for blob in page]
+        return objects, pages.continuation_token
+
+    def list_level(self, prefix="", delimiter="/"):
+        from azure.storage.blob import BlobPrefix
+        objects, prefixes = [], []
+        for item in self.container.walk_blobs(name_starts_with=prefix, delimiter=delimiter):
+            if isinstance(item, BlobPrefix):
+                prefixes.append(item.name)
+            else:
+                objects.append({"key": item.name, "size": item.size,
+                                "etag": item.etag.strip('"')})
+        return objects, sorted(prefixes)
+
+    def _put_object(self, key, data):
+        self.container.get_blob_client(key).upload_blob(data, overwrite=True)
+
+    def _begin_multipart(self, key):
+        return hashlib.sha1(f"{key}{time.time_ns()}".encode()).hexdigest()[:16]
+
+    def _upload_part(self, key, upload, number, data):
+        # Block IDs must be base64 and the same length for every block of a blob
+        block_id = base64.b64encode(f"{upload}-{number:06d}".encode()).decode()
+        self.container.get_blob_client(key).stage_block(block_id, data)
+        return (number, block_id)
+
+    def _complete_multipart(self, key, upload, parts):
+        from azure.storage.blob import BlobBlock
+        blocks = [BlobBlock(block_id=block_id) for _, block_id in sorted(parts)]
+        self.container.get_blob_client(key).commit_block_list(blocks)
+
+    def _read_range(self, key, start, end):
+        downloader = self.container.get_blob_client(key).download_blob(
+            offset=start, length=end - start)
+        return downloader.readall()
+
+
+if __name__ == "__main__":
+    # Example 1: Multipart Upload and Parallel Download (local backend)
+    # Same code path as the cloud backends, runnable without credentials
+    print("=== Unified Blob Storage (local backend) ===")
+    workdir = tempfile.mkdtemp()
+    store = LocalBlobStore(os.path.join(workdir, "bucket"),
+                           TransferConfig(part_size=4 * MiB, multipart_threshold=8 * MiB))
+
+    artifact = os.path.join(workdir, "model.bin")
+    with open(artifact, "wb") as f:
+        f.write(os.urandom(40 * MiB))  # stand-in for a multi-GB model artifact
+
+    start = time.perf_counter()
+    store.put("models/v1/model.bin", artifact)
+    print(f"Uploaded 40 MiB in 10 parts in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    restored = os.path.join(workdir, "restored.bin")
+    store.get("models/v1/model.bin", restored)
+    print(f"Downloaded straight to disk in {time.perf_counter() - start:.2f}s")
+
+    with open(artifact, "rb") as a, open(restored, "rb") as b:
+        print(f"Round trip identical: {a.read() == b.read()}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Listing and Streaming
+    print("=== List and Stream ===")
+    store.put("datasets/train.csv", artifact)
+    for obj in store.list("models/"):
+        print(f"  - {obj['key']} ({obj['size'] / MiB:.0f} MiB)")
+    checksum = hashlib.sha256()
+    for chunk in store.stream("datasets/train.csv", chunk_size=MiB):
+        checksum.update(chunk)  # e.g. hash or parse without holding the object
+    print(f"Streamed sha256: {checksum.hexdigest()[:16]}...")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Cloud Backends
+    # Identical calls; only construction differs (requires SDKs and credentials)
+    print("=== Cloud Backends ===")
+    for name, factory in [
+        ("S3", lambda: S3BlobStore("my-bucket")),
+        ("GCS", lambda: GCSBlobStore("my-bucket")),
+        ("Azure", lambda: AzureBlobStore("my-container", "CONNECTION_STRING")),
+    ]:
+        try:
+            cloud = factory()
+            cloud.put("models/v1/model.bin", artifact)
+            print(f"{name}: uploaded model.bin")
+        except Exception as e:
+            print(f"{name} example (requires SDK and credentials): {e}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n=== Unified Storage Benefits in MLOps ===")
+    print("- One interface for every cloud; local backend for tests")
+    print("- Parts transferred concurrently saturate the network for multi-GB artifacts")
+    print("- Downloads written in place on disk, never buffered whole in memory")
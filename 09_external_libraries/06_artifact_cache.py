@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+"""
+Local LRU Artifact Cache for MLOps
+Demonstrates a read-through on-disk cache in front of blob storage:
+entries keyed by location plus ETag, revalidated with conditional
+requests, evicted least-recently-used within a byte budget, written
+with atomic renames and served to readers through mmap
+"""
+
+import hashlib
+import importlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Reuse the storage backends (S3, GCS, Azure, local) from the storage example
+storage = importlib.import_module("04_unified_blob_storage")
+
+
+class ArtifactCache:
+    """
+    Read-through cache of blob store objects on local disk
+
+    Layout (one pair of files per cached object):
+        <sha256(uri)>.json               metadata: uri, etag, size, validated_at
+        <sha256(uri)>.<sha(etag)>.blob   object bytes for that exact version
+
+    Every file is written to a temp name and renamed into place, so
+    concurrent processes sharing the directory never read partial data.
+    Recency is the blob file's mtime, touched on every hit.
+
+    Args:
+        store: Any BlobStore backend
+        cache_dir: Local cache directory (can be shared by many processes)
+        max_bytes: Total size budget for cached blobs
+        revalidate_after: Seconds a validated entry is trusted before a
+            conditional request checks it again (0 = always revalidate)
+    """
+
+    def __init__(self, store, cache_dir, max_bytes=50 * 1024 ** 3, revalidate_after=300):
+        self.store = store
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "refreshed": 0,
+                      "evicted": 0, "bytes_downloaded": 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # Public API ---------------------------------------------------------------
+
+    def path(self, key):
+        """
+        Local path of a fresh copy of key, downloading only when needed
+
+        Another process sharing the cache may evict the file at any time
+        after this returns; prefer open()/read(), which hold a handle.
+        """
+        uri = self.store.uri(key)
+        digest = hashlib.sha256(uri.encode()).hexdigest()
+        meta = self._read_meta(digest)
+
+        if meta is not None and os.path.exists(meta["blob"]):
+            if time.time() - meta["validated_at"] < self.revalidate_after:
+                blob = self._hit(meta)
+                if blob is not None:
+                    return blob
+            else:
+                changed = self.store.stat_if_modified(key, meta["etag"])  # conditional request
+                if changed is not None:
+                    self._count("refreshed")
+                    return self._fetch(key, uri, digest, changed, stale=meta)
+                self._count("revalidated")
+                meta["validated_at"] = time.time()
+                self._write_meta(digest, meta)
+                blob = self._hit(meta)
+                if blob is not None:
+                    return blob
+
+        self._count("misses")
+        return self._fetch(key, uri, digest, self.store.stat(key), stale=None)
+
+    @contextmanager
+    def open(self, key):
+        """
+        Serve an object as a read-only mmap (zero-copy, shared page cache)
+
+        Once open, eviction by another process only unlinks the name; the
+        mapping stays valid until the block exits.
+        """
+        try:
+            f = open(self.path(key), "rb")
+        except FileNotFoundError:
+            f = open(self.path(key), "rb")  # evicted between lookup and open: fetch again
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""  # empty files cannot be memory-mapped
+                return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mm
+            finally:
+                mm.close()
+
+    def read(self, key):
+        """Convenience: whole object as bytes"""
+        with self.open(key) as data:
+            return bytes(data)
+
+    def usage(self):
+        """Total bytes of cached blobs"""
+        return sum(size for _, size, _ in self._entries())
+
+    # Internals ----------------------------------------------------------------
+
+    def _hit(self, meta):
+        """Bump recency and return the blob path, or None if it was just evicted"""
+        try:
+            os.utime(meta["blob"])  # bump recency for LRU
+        except FileNotFoundError:
+            return None  # another process evicted it after the lookup: treat as a miss
+        self._count("hits")
+        return meta["blob"]
+
+    def _fetch(self, key, uri, digest, stat, stale):
+        etag_digest = hashlib.sha256(stat["etag"].encode()).hexdigest()[:16]
+        blob_path = os.path.join(self.cache_dir, f"{digest}.{etag_digest}.blob")
+
+        # Make room first so the budget holds even while the download runs
+        self._evict(needed=stat["size"])
+        self.store.get(key, blob_path)  # parallel ranged download + atomic rename
+        with self._lock:
+            self.stats["bytes_downloaded"] += stat["size"]
+
+        self._write_meta(digest, {"uri": uri, "etag": stat["etag"], "size": stat["size"],
+                                  "blob": blob_path, "validated_at": time.time()})
+        if stale is not None and stale["blob"] != blob_path:
+            _remove(stale["blob"])  # open mmaps of the old version stay valid on POSIX
+        return blob_path
+
+    def _entries(self):
+        """(path, size, mtime) of every cached blob"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".blob"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # evicted concurrently by another process
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self, needed=0):
+        """Delete least-recently-used blobs until `needed` more bytes fit the budget"""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total + needed <= self.max_bytes:
+                    break
+                _remove(path)
+                digest = os.path.basename(path).split(".", 1)[0]
+                _remove(os.path.join(self.cache_dir, f"{digest}.json"))
+                total -= size
+                self.stats["evicted"] += 1
+
+    def _read_meta(self, digest):
+        try:
+            with open(os.path.join(self.cache_dir, f"{digest}.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, digest, meta):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.cache_dir, f"{digest}.json"))
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+if __name__ == "__main__":
+    import shutil
+
+    class SlowStore(storage.LocalBlobStore):
+        """Local backend with simulated network bandwidth on reads"""
+
+        def _read_range(self, key, start, end):
+            time.sleep((end - start) / 200e6)  # ~200 MB/s link
+            return super()._read_range(key, start, end)
+
+    workdir = tempfile.mkdtemp()
+    store = SlowStore(os.path.join(workdir, "bucket"))
+    for name, size_mb in [("datasets/train.parquet", 60), ("models/v1/model.bin", 40),
+                          ("models/v2/model.bin", 40)]:
+        src = os.path.join(workdir, "upload.bin")
+        with open(src, "wb") as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+        store.put(name, src)
+
+    cache = ArtifactCache(store, os.path.join(workdir, "cache"), max_bytes=64 * 1024 * 1024,
+                          revalidate_after=0)
+
+    # Example 1: Read-Through Caching
+    # The first run downloads; repeated runs revalidate with a conditional request
+    print("=== Read-Through Cache ===")
+    for run in range(3):
+        start = time.perf_counter()
+        with cache.open("datasets/train.parquet") as data:
+            header = data[:4]  # mmap: only touched pages are read
+        print(f"Run {run + 1}: {time.perf_counter() - start:.3f}s")
+    print(f"Stats: {cache.stats}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Changed Objects Are Refreshed
+    print("=== ETag Revalidation ===")
+    time.sleep(0.01)  # ensure a new mtime-based ETag on the local backend
+    with open(src, "wb") as f:
+        f.write(b"retrained dataset")
+    store.put("datasets/train.parquet", src)
+    print(f"After upstream change: {cache.read('datasets/train.parquet')!r}")
+    print(f"Refreshed entries: {cache.stats['refreshed']}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: LRU Eviction Within a Byte Budget
+    print("=== LRU Eviction ===")
+    cache.path("models/v1/model.bin")
+    cache.path("models/v2/model.bin")
+    cache.path("datasets/train.parquet")  # most recently used survives
+    print(f"Cache usage: {cache.usage() / 1024 ** 2:.0f} MiB of "
+          f"{cache.max_bytes / 1024 ** 2:.0f} MiB budget, evicted: {cache.stats['evicted']}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n=== Artifact Cache Benefits in MLOps ===")
+    print("- Repeated runs skip network I/O for unchanged datasets and models")
+    print("- ETag keys and conditional requests never serve stale artifacts")
+    print("- Atomic renames make one cache directory safe for many processes")
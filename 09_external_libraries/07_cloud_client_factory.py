@@ -0,0 +1,235 @@
+#!/usr/bin/python3
+"""
+Pooled, Lazily-Imported Cloud SDK Clients for MLOps
+Demonstrates a client factory that imports boto3 / google-cloud-storage /
+azure-storage-blob only on first use, caches clients per process or per
+thread with fork safety, sizes HTTP connection pools to the job's
+concurrency and reports import, creation and connection-reuse timings
+"""
+
+import importlib
+import os
+import threading
+import time
+import weakref
+
+
+# Client builders: (factory, SDK module) -> configured client ----------------
+
+def _build_s3(factory, boto3):
+    from botocore.config import Config
+    config = Config(max_pool_connections=factory.max_pool_connections,
+                    retries={"mode": "adaptive", "max_attempts": 5},
+                    tcp_keepalive=True)
+    return boto3.session.Session().client("s3", config=config, **factory.options.get("s3", {}))
+
+
+def _mount_pool(session, size):
+    """Give a requests.Session an HTTP(S) pool of `size` keep-alive connections"""
+    import requests
+    adapter = requests.adapters.HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _build_gcs(factory, storage):
+    client = storage.Client(**factory.options.get("gcs", {}))
+    # The client's AuthorizedSession is a requests.Session: resize its pool
+    _mount_pool(client._http, factory.max_pool_connections)
+    return client
+
+
+def _build_azure(factory, blob):
+    import requests
+    from azure.core.pipeline.transport import RequestsTransport
+    options = dict(factory.options.get("azure", {}))
+    session = _mount_pool(requests.Session(), factory.max_pool_connections)
+    transport = RequestsTransport(session=session, session_owner=False)
+    connection_string = options.pop("connection_string",
+                                    os.environ.get("AZURE_STORAGE_CONNECTION_STRING"))
+    return blob.BlobServiceClient.from_connection_string(connection_string,
+                                                         transport=transport, **options)
+
+
+PROVIDERS = {
+    "s3": ("boto3", _build_s3),
+    "gcs": ("google.cloud.storage", _build_gcs),
+    "azure": ("azure.storage.blob", _build_azure),
+}
+
+
+class ClientFactory:
+    """
+    Lazily-created, cached SDK clients
+
+    Args:
+        max_pool_connections: HTTP keep-alive connections per client; set it
+            to the number of threads that will share the client
+        scope: "process" shares one client across threads (boto3 clients,
+            GCS and Azure clients are thread-safe); "thread" gives each
+            thread its own client (for non-thread-safe resources)
+        options: Per-provider keyword arguments, e.g. {"s3": {"region_name": ...}}
+    """
+
+    def __init__(self, max_pool_connections=32, scope="process", options=None):
+        if scope not in ("process", "thread"):
+            raise ValueError(f"Unknown scope '{scope}' (expected 'process' or 'thread')")
+        self.max_pool_connections = max_pool_connections
+        self.scope = scope
+        self.options = options or {}
+        self.providers = dict(PROVIDERS)
+        self.timings = {"import_s": {}, "create_s": {}}
+        self._reset()
+        # Clients own sockets and locks that must never be shared across fork;
+        # a weak reference keeps the hook from pinning the factory in memory
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: ref() and ref()._reset())
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._modules = {}
+        self._process_clients = {}
+        self._thread_clients = threading.local()
+        self._lock = threading.Lock()
+
+    def register(self, name, module, builder):
+        """Add a provider: builder(factory, imported_module) -> client"""
+        self.providers[name] = (module, builder)
+
+    def get(self, name):
+        """Return the cached client for this process/thread, creating it on first use"""
+        if os.getpid() != self._pid:
+            self._reset()  # forked without the at-fork hook (e.g. os.fork on old Pythons)
+
+        if self.scope == "thread":
+            clients = self._thread_clients.__dict__
+            if name not in clients:
+                clients[name] = self._create(name)
+            return clients[name]
+
+        client = self._process_clients.get(name)  # fast path: no lock
+        if client is None:
+            with self._lock:
+                client = self._process_clients.get(name)
+                if client is None:
+                    client = self._process_clients[name] = self._create(name)
+        return client
+
+    def s3(self):
+        return self.get("s3")
+
+    def gcs(self):
+        return self.get("gcs")
+
+    def azure(self):
+        return self.get("azure")
+
+    def _import(self, module_name):
+        module = self._modules.get(module_name)
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)  # paid once, on first use
+            self.timings["import_s"][module_name] = round(time.perf_counter() - start, 4)
+            self._modules[module_name] = module
+        return module
+
+    def _create(self, name):
+        module_name, builder = self.providers[name]
+        module = self._import(module_name)
+        start = time.perf_counter()
+        client = builder(self, module)
+        elapsed = round(time.perf_counter() - start, 4)
+        self.timings["create_s"].setdefault(name, []).append(elapsed)
+        return client
+
+    def connection_stats(self, name):
+        """
+        New connections vs requests served by a client's urllib3 pools
+
+        A reuse ratio near 1.0 means requests ride on warm keep-alive
+        connections. Best effort: reads SDK internals that may change.
+        """
+        client = self.get(name)
+        try:
+            if name == "s3":
+                manager = client._endpoint.http_session._manager
+            elif name == "gcs":
+                manager = client._http.get_adapter("https://").poolmanager
+            else:
+                manager = client._config.transport.session.get_adapter("https://").poolmanager
+        except AttributeError:
+            return None
+        pools = list(manager.pools._container.values())
+        connections = sum(pool.num_connections for pool in pools)
+        requests_served = sum(pool.num_requests for pool in pools)
+        reuse = 1 - connections / requests_served if requests_served else 0.0
+        return {"connections": connections, "requests": requests_served,
+                "reuse_ratio": round(reuse, 3)}
+
+
+if __name__ == "__main__":
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Example 1: Lazy Imports
+    # Importing this module costs nothing; SDKs load when a client is first needed
+    print("=== Lazy SDK Imports ===")
+    factory = ClientFactory(max_pool_connections=64)
+    print(f"boto3 imported at startup: {'boto3' in sys.modules}")
+    for name in ("s3", "gcs", "azure"):
+        try:
+            factory.get(name)
+            print(f"{name}: client ready")
+        except Exception as e:
+            print(f"{name} client (requires SDK and credentials): {e}")
+    print(f"Timings: {factory.timings}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Process vs Thread Scope
+    # sqlite3 connections are not thread-safe, so they use per-thread clients
+    print("=== Client Scopes ===")
+
+    def _build_sqlite(factory, sqlite3):
+        return sqlite3.connect(":memory:")
+
+    shared = ClientFactory(scope="process")
+    per_thread = ClientFactory(scope="thread")
+    for f in (shared, per_thread):
+        f.register("sqlite", "sqlite3", _build_sqlite)
+
+    def client_id(factory):
+        time.sleep(0.001)  # keep all 4 worker threads busy
+        return id(factory.get("sqlite"))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        shared_ids = set(executor.map(client_id, [shared] * 100))
+        thread_ids = set(executor.map(client_id, [per_thread] * 100))
+    print(f"process scope: {len(shared_ids)} client(s) for 100 calls on 4 threads")
+    print(f"thread scope:  {len(thread_ids)} client(s) for 100 calls on 4 threads")
+    print(f"Creation timings: {per_thread.timings['create_s']}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Fork Safety
+    # A forked child must build its own client instead of reusing the parent's sockets
+    print("=== Fork Safety ===")
+    shared.get("sqlite")
+    created_in_parent = len(shared.timings["create_s"]["sqlite"])
+    if hasattr(os, "fork"):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            shared.get("sqlite")
+            fresh = len(shared.timings["create_s"]["sqlite"]) > created_in_parent
+            os.write(write_end, b"fresh" if fresh else b"reused")
+            os._exit(0)
+        os.waitpid(pid, 0)
+        print(f"Child process got a {os.read(read_end, 16).decode()} client")
+
+    print("\n=== Client Factory Benefits in MLOps ===")
+    print("- SDK import cost is paid only by code paths that use that cloud")
+    print("- One warm client per process reuses keep-alive connections")
+    print("- Pool size matched to thread count avoids 'connection pool is full' churn")
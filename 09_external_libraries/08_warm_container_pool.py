@@ -0,0 +1,305 @@
+#!/usr/bin/python3
+"""
+Warm Container Pool for MLOps Batch Jobs
+Demonstrates keeping a pool of long-running containers and dispatching
+thousands of short batch-inference commands into them with `exec`,
+instead of starting and removing a fresh container per command, with
+bounded concurrency, incremental log streaming and per-job latency
+"""
+
+import itertools
+import queue
+import statistics
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobResult:
+    """Outcome of one command executed in a pooled container"""
+
+    def __init__(self, command, container_id, exit_code, queue_wait_s, duration_s,
+                 stdout_tail, stderr_tail):
+        self.command = command
+        self.container_id = container_id
+        self.exit_code = exit_code
+        self.queue_wait_s = queue_wait_s  # time spent waiting for a free container
+        self.duration_s = duration_s      # exec time inside the container
+        self.stdout_tail = stdout_tail
+        self.stderr_tail = stderr_tail
+
+    @property
+    def ok(self):
+        return self.exit_code == 0
+
+    def __repr__(self):
+        return (f"JobResult(command={self.command!r}, exit_code={self.exit_code}, "
+                f"duration_s={self.duration_s:.3f})")
+
+
+class WarmContainerPool:
+    """
+    Fixed-size pool of idle containers kept alive with a no-op entrypoint
+
+    Args:
+        client: docker.DockerClient (or a compatible fake)
+        image: Image with the inference code and model baked in
+        size: Number of warm containers
+        run_kwargs: Extra containers.run() arguments (volumes, mem_limit, ...);
+            pass entrypoint= to replace the default `sleep infinity`
+    """
+
+    def __init__(self, client, image, size=4, run_kwargs=None):
+        self.client = client
+        self.image = image
+        self.size = size
+        self.run_kwargs = run_kwargs or {}
+        self._idle = queue.Queue()
+        self._containers = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start all containers concurrently; startup cost is paid once"""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for container in executor.map(lambda _: self._start_one(), range(self.size)):
+                self._idle.put(container)
+        return self
+
+    def _start_one(self):
+        # Override the entrypoint, not the command: with a model-serving image's own
+        # ENTRYPOINT, a command would only become that server's arguments
+        kwargs = {"entrypoint": ["sleep", "infinity"], **self.run_kwargs}
+        container = self.client.containers.run(self.image, detach=True, **kwargs)
+        with self._lock:
+            self._containers.append(container)
+        return container
+
+    def acquire(self, timeout=None):
+        """Take an idle container, replacing it first if it has died"""
+        container = self._idle.get(timeout=timeout)
+        container.reload()
+        if container.status != "running":
+            self._discard(container)
+            container = self._start_one()
+        return container
+
+    def release(self, container):
+        self._idle.put(container)
+
+    def _discard(self, container):
+        with self._lock:
+            self._containers.remove(container)
+        try:
+            container.remove(force=True)
+        except Exception:
+            pass  # already gone
+
+    def close(self):
+        with self._lock:
+            containers, self._containers = self._containers, []
+        for container in containers:
+            try:
+                container.remove(force=True)
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PooledJobRunner:
+    """
+    Run commands in a WarmContainerPool with bounded concurrency
+
+    Args:
+        pool: Started WarmContainerPool
+        max_concurrency: Jobs running at once (defaults to pool size)
+        on_output: Optional callback(command, stream_name, line) called as
+            each line arrives, so long jobs are observable while running
+        tail_lines: Lines of stdout/stderr kept per job in the result
+    """
+
+    def __init__(self, pool, max_concurrency=None, on_output=None, tail_lines=20):
+        self.pool = pool
+        self.max_concurrency = max_concurrency or pool.size
+        self.on_output = on_output
+        self.tail_lines = tail_lines
+
+    def run(self, command):
+        """Execute one command in a pooled container and stream its output"""
+        queued = time.perf_counter()
+        container = self.pool.acquire()
+        started = time.perf_counter()
+        try:
+            api = self.pool.client.api
+            exec_id = api.exec_create(container.id, command)["Id"]
+            tails = {"stdout": deque(maxlen=self.tail_lines),
+                     "stderr": deque(maxlen=self.tail_lines)}
+            partial = {"stdout": b"", "stderr": b""}
+
+            # demux=True yields (stdout_chunk, stderr_chunk) pairs as they arrive
+            for out, err in api.exec_start(exec_id, stream=True, demux=True):
+                for name, chunk in (("stdout", out), ("stderr", err)):
+                    if chunk:
+                        partial[name] = self._emit_lines(command, name,
+                                                         partial[name] + chunk, tails)
+            for name, rest in partial.items():
+                if rest:
+                    self._emit(command, name, rest.decode(errors="replace"), tails)
+
+            exit_code = api.exec_inspect(exec_id)["ExitCode"]
+        finally:
+            self.pool.release(container)
+
+        return JobResult(command, container.id, exit_code, started - queued,
+                         time.perf_counter() - started,
+                         "\n".join(tails["stdout"]), "\n".join(tails["stderr"]))
+
+    def run_many(self, commands):
+        """Run commands concurrently; results are returned in input order"""
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(self.run, commands))
+
+    def _emit_lines(self, command, name, buffer, tails):
+        """Emit every complete line in buffer; return the unfinished remainder"""
+        *lines, rest = buffer.split(b"\n")
+        for line in lines:
+            self._emit(command, name, line.decode(errors="replace"), tails)
+        return rest
+
+    def _emit(self, command, name, line, tails):
+        tails[name].append(line)
+        if self.on_output is not None:
+            self.on_output(command, name, line)
+
+
+def latency_summary(results):
+    """Per-job latency percentiles across a batch of JobResults"""
+    durations = sorted(r.duration_s for r in results)
+    waits = sorted(r.queue_wait_s for r in results)
+    return {
+        "jobs": len(results),
+        "failed": sum(not r.ok for r in results),
+        "p50_s": round(statistics.median(durations), 4),
+        "p95_s": round(durations[int(0.95 * (len(durations) - 1))], 4),
+        "mean_queue_wait_s": round(statistics.mean(waits), 4),
+    }
+
+
+# Fake Docker client ---------------------------------------------------------------
+# Mirrors the subset of the docker SDK used above; commands run as local processes
+
+class FakeContainer:
+    _ids = itertools.count(1)  # next() on a count is atomic under the GIL
+
+    def __init__(self, client):
+        self.id = f"fake{next(FakeContainer._ids):04d}"
+        self.status = "running"
+        self.client = client
+
+    def reload(self):
+        pass
+
+    def remove(self, force=False):
+        self.status = "removed"
+        self.client.removed += 1
+
+
+class _FakeContainers:
+    def __init__(self, client):
+        self.client = client
+
+    def run(self, image, command=None, detach=False, **kwargs):
+        time.sleep(self.client.startup_latency)  # image/container startup cost
+        self.client.started += 1
+        return FakeContainer(self.client)
+
+
+class _FakeAPI:
+    def __init__(self, client):
+        self.client = client
+        self.execs = {}
+        self._ids = itertools.count()
+
+    def exec_create(self, container_id, cmd):
+        exec_id = f"exec-{next(self._ids)}"
+        self.execs[exec_id] = {"cmd": cmd, "exit_code": None}
+        return {"Id": exec_id}
+
+    def exec_start(self, exec_id, stream=False, demux=False):
+        time.sleep(self.client.exec_latency)
+        info = self.execs[exec_id]
+        proc = subprocess.run(info["cmd"], capture_output=True,
+                              shell=isinstance(info["cmd"], str))
+        info["exit_code"] = proc.returncode
+        # Deliver output in small chunks, as the daemon's multiplexed stream does
+        for i in range(0, len(proc.stdout), 16):
+            yield proc.stdout[i:i + 16], None
+        if proc.stderr:
+            yield None, proc.stderr
+
+    def exec_inspect(self, exec_id):
+        return {"ExitCode": self.execs[exec_id]["exit_code"], "Running": False}
+
+
+class FakeDockerClient:
+    """In-process stand-in for docker.DockerClient used in tests and demos"""
+
+    def __init__(self, startup_latency=0.5, exec_latency=0.01):
+        self.startup_latency = startup_latency
+        self.exec_latency = exec_latency
+        self.started = 0
+        self.removed = 0
+        self.containers = _FakeContainers(self)
+        self.api = _FakeAPI(self)
+
+
+if __name__ == "__main__":
+    # Example 1: Warm Pool vs Container-per-Command
+    # A fake client with 0.5s container startup makes the difference visible
+    print("=== Warm Container Pool ===")
+    client = FakeDockerClient(startup_latency=0.5)
+    commands = [["sh", "-c", f"echo scoring batch {i}; echo 'batch {i} done'"]
+                for i in range(40)]
+
+    start = time.perf_counter()
+    with WarmContainerPool(client, "inference:latest", size=4) as pool:
+        runner = PooledJobRunner(pool)
+        results = runner.run_many(commands)
+    pooled_s = time.perf_counter() - start
+    print(f"{len(results)} jobs on {client.started} warm containers in {pooled_s:.2f}s")
+    print(f"Per-command containers would pay {len(commands) * 0.5:.0f}s of startup alone")
+    print(f"Latency: {latency_summary(results)}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Incremental Log Streaming
+    # Lines are delivered while the job runs, so nothing is missed
+    print("=== Streaming Job Output ===")
+    with WarmContainerPool(FakeDockerClient(startup_latency=0), "inference:latest", size=2) as pool:
+        runner = PooledJobRunner(
+            pool, on_output=lambda cmd, stream, line: print(f"  [{stream}] {line}"))
+        result = runner.run(["sh", "-c", "echo loading model; echo predicting; echo oops >&2; exit 3"])
+    print(f"Exit code: {result.exit_code}, stderr tail: {result.stderr_tail!r}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Real Docker Daemon
+    print("=== Docker SDK ===")
+    try:
+        import docker
+        with WarmContainerPool(docker.from_env(), "ubuntu:20.04", size=2) as pool:
+            results = PooledJobRunner(pool).run_many([["echo", f"hello {i}"] for i in range(6)])
+        print(f"Docker: {latency_summary(results)}")
+    except Exception as e:
+        print(f"Docker example (requires docker library and Docker daemon): {e}")
+
+    print("\n=== Warm Pool Benefits in MLOps ===")
+    print("- Container startup is paid once per pool slot, not once per job")
+    print("- exec output is streamed, so logs are never read before they exist")
+    print("- Concurrency is bounded and every job's latency is recorded")
@@ -0,0 +1,445 @@
+#!/usr/bin/python3
+"""
+Kubernetes Informer Cache for MLOps
+Demonstrates an informer-style pod cache: one paginated list, then
+incremental watch events applied to an in-memory store with indexes by
+namespace, label and phase, so queries like "running training pods"
+are local lookups instead of full list_pod_for_all_namespaces() calls
+"""
+
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger("informer")
+
+
+def _pod_key(pod):
+    return f"{pod.metadata.namespace}/{pod.metadata.name}"
+
+
+def _is_gone(error):
+    """410 Gone: our resourceVersion is too old and the watch cannot resume"""
+    return getattr(error, "status", None) == 410
+
+
+class PodInformer:
+    """
+    Local, continuously updated cache of pods
+
+    Args:
+        api: kubernetes.client.CoreV1Api (or a compatible fake)
+        namespace: Watch one namespace, or None for all namespaces
+        index_labels: Label keys to index (e.g. "app", "job-type")
+        page_size: Pods per list request (limit/_continue pagination)
+        watch_timeout: Seconds before a watch is re-established server-side
+        watch_factory: Callable returning a kubernetes.watch.Watch
+    """
+
+    def __init__(self, api, namespace=None, index_labels=("app",), page_size=500,
+                 watch_timeout=300, watch_factory=None):
+        self.api = api
+        self.namespace = namespace
+        self.index_labels = tuple(index_labels)
+        self.page_size = page_size
+        self.watch_timeout = watch_timeout
+        if watch_factory is None:
+            from kubernetes import watch
+            watch_factory = watch.Watch
+        self._watch_factory = watch_factory
+        self._list_func = (api.list_pod_for_all_namespaces if namespace is None
+                           else api.list_namespaced_pod)
+        self._list_args = () if namespace is None else (namespace,)
+
+        self._lock = threading.RLock()
+        self._pods = {}
+        self._by_namespace = {}
+        self._by_label = {}
+        self._by_phase = {}
+        self._resource_version = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._watch = None
+        self._response = None  # HTTP response of the current watch, closed by stop()
+        self.handlers = {"add": [], "update": [], "delete": []}
+        self.stats = {"list_requests": 0, "relists": 0, "events": 0}
+
+    # Lifecycle -------------------------------------------------------------------
+
+    def start(self):
+        """
+        Initial paginated list (blocking), then watch in the background
+
+        A restarted informer resumes watching from its last resourceVersion
+        and only relists if the server has since expired that version.
+        Raises RuntimeError while the previous watch thread is still alive.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("Previous watch thread has not exited; call stop() again")
+        if self._resource_version is None:
+            self._relist()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="pod-informer",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        """
+        Stop watching and wait up to timeout seconds for the thread to exit
+
+        Watch.stop() is only checked between events, so the open watch
+        response is also shut down to interrupt a read that would
+        otherwise block until the server-side watch_timeout.
+        """
+        self._stop.set()
+        if self._watch is not None:
+            self._watch.stop()
+        response = self._response
+        if response is not None:
+            # shutdown() (urllib3 >= 2.3) interrupts a blocked read; close() may not
+            close = getattr(response, "shutdown", None) or response.close
+            try:
+                close()
+            except Exception:
+                pass  # already closed
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def on(self, event, handler):
+        """Register handler(pod) or handler(old, new) for add/delete/update"""
+        self.handlers[event].append(handler)
+
+    # Queries (O(result) local lookups) -----------------------------------------
+
+    def get(self, namespace, name):
+        with self._lock:
+            return self._pods.get(f"{namespace}/{name}")
+
+    def select(self, namespace=None, phase=None, labels=None):
+        """Pods matching every given criterion, using the smallest index first"""
+        with self._lock:
+            candidates = []
+            if namespace is not None:
+                candidates.append(self._by_namespace.get(namespace, set()))
+            if phase is not None:
+                candidates.append(self._by_phase.get(phase, set()))
+            for key, value in (labels or {}).items():
+                if key not in self.index_labels:
+                    raise KeyError(f"Label '{key}' is not indexed; add it to index_labels")
+                candidates.append(self._by_label.get((key, value), set()))
+
+            if not candidates:
+                return list(self._pods.values())
+            candidates.sort(key=len)
+            keys = candidates[0].intersection(*candidates[1:])
+            return [self._pods[k] for k in keys]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pods)
+
+    # Listing and watching ----------------------------------------------------------
+
+    def _list_all(self):
+        """Paginated list; returns (pods by key, resourceVersion of the snapshot)"""
+        pods, token = {}, None
+        while True:
+            kwargs = {"limit": self.page_size}
+            if token:
+                kwargs["_continue"] = token
+            page = self._list_func(*self._list_args, **kwargs)
+            self.stats["list_requests"] += 1
+            for pod in page.items:
+                pods[_pod_key(pod)] = pod
+            token = page.metadata._continue
+            if not token:
+                return pods, page.metadata.resource_version
+
+    def _relist(self):
+        """Replace the store with a fresh list, firing events for the differences"""
+        pods, resource_version = self._list_all()
+        with self._lock:
+            old_keys = set(self._pods)
+            for key in old_keys - set(pods):
+                self._apply("DELETED", self._pods[key])
+            for pod in pods.values():
+                self._apply("MODIFIED" if _pod_key(pod) in old_keys else "ADDED", pod)
+            self._resource_version = resource_version
+            self.stats["relists"] += 1
+
+    def _watch_loop(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._watch = self._watch_factory()
+                for event in self._watch.stream(
+                    self._watch_call(), *self._list_args,
+                    resource_version=self._resource_version,
+                    timeout_seconds=self.watch_timeout,
+                    allow_watch_bookmarks=True,
+                ):
+                    if self._stop.is_set():
+                        break
+                    if event["type"] == "ERROR":
+                        obj = event["object"]
+                        code = obj.get("code") if isinstance(obj, dict) else getattr(obj, "code", None)
+                        if code == 410:
+                            logger.info("Watch expired (410 Gone), relisting")
+                            self._relist()
+                            break
+                        raise RuntimeError(f"Watch error: {obj}")
+                    self._handle(event)
+                backoff = 1.0
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                if _is_gone(e):
+                    self._relist()
+                    continue
+                logger.warning("Watch failed (%s); relisting in %.0fs", e, backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+                try:
+                    self._relist()
+                except Exception as relist_error:
+                    logger.warning("Relist failed: %s", relist_error)
+
+    def _watch_call(self):
+        """List function for Watch.stream that keeps its response, so stop() can close it"""
+        @functools.wraps(self._list_func)  # Watch reads the return type from the docstring
+        def call(*args, **kwargs):
+            self._response = self._list_func(*args, **kwargs)
+            return self._response
+        return call
+
+    def _handle(self, event):
+        obj = event["object"]
+        with self._lock:
+            self._resource_version = obj.metadata.resource_version
+            if event["type"] == "BOOKMARK":
+                return  # progress marker only: lets a restarted watch resume later
+            self.stats["events"] += 1
+            self._apply(event["type"], obj)
+
+    # Store and indexes -------------------------------------------------------------
+
+    def _apply(self, event_type, pod):
+        key = _pod_key(pod)
+        old = self._pods.get(key)
+        if old is not None:
+            self._unindex(key, old)
+
+        if event_type == "DELETED":
+            self._pods.pop(key, None)
+            self._fire("delete", pod)
+            return
+
+        self._pods[key] = pod
+        self._index(key, pod)
+        if old is None:
+            self._fire("add", pod)
+        else:
+            self._fire("update", old, pod)
+
+    def _index_entries(self, pod):
+        labels = pod.metadata.labels or {}
+        yield self._by_namespace, pod.metadata.namespace
+        yield self._by_phase, pod.status.phase if pod.status else None
+        for label in self.index_labels:
+            if label in labels:
+                yield self._by_label, (label, labels[label])
+
+    def _index(self, key, pod):
+        for index, value in self._index_entries(pod):
+            index.setdefault(value, set()).add(key)
+
+    def _unindex(self, key, pod):
+        for index, value in self._index_entries(pod):
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del index[value]
+
+    def _fire(self, event, *args):
+        for handler in self.handlers[event]:
+            try:
+                handler(*args)
+            except Exception:
+                logger.exception("Informer %s handler failed", event)
+
+
+# Fake Kubernetes API -------------------------------------------------------------
+# Implements paginated list, watch from a resourceVersion and 410 on compaction
+
+class _Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_pod(namespace, name, phase="Pending", labels=None):
+    return _Obj(metadata=_Obj(namespace=namespace, name=name, labels=labels or {},
+                              resource_version=None),
+                status=_Obj(phase=phase))
+
+
+class FakeCoreV1Api:
+    """In-memory pod API with a bounded event history (like etcd compaction)"""
+
+    def __init__(self, history=1000):
+        self.history = history
+        self.pods = {}
+        self.events = []  # (resource_version, type, pod)
+        self.resource_version = 0
+        self.list_calls = 0
+        self._cond = threading.Condition()
+
+    def upsert(self, pod):
+        with self._cond:
+            self.resource_version += 1
+            pod.metadata.resource_version = str(self.resource_version)
+            key = _pod_key(pod)
+            event_type = "MODIFIED" if key in self.pods else "ADDED"
+            self.pods[key] = pod
+            self._record(event_type, pod)
+
+    def delete(self, namespace, name):
+        with self._cond:
+            pod = self.pods.pop(f"{namespace}/{name}")
+            self.resource_version += 1
+            pod.metadata.resource_version = str(self.resource_version)
+            self._record("DELETED", pod)
+
+    def compact(self):
+        """Drop all history so existing watches get 410 Gone"""
+        with self._cond:
+            self.events.clear()
+            self._cond.notify_all()
+
+    def _record(self, event_type, pod):
+        self.events.append((self.resource_version, event_type, pod))
+        del self.events[:-self.history]
+        self._cond.notify_all()
+
+    def list_pod_for_all_namespaces(self, limit=None, _continue=None, **kwargs):
+        return self._list(None, limit, _continue)
+
+    def list_namespaced_pod(self, namespace, limit=None, _continue=None, **kwargs):
+        return self._list(namespace, limit, _continue)
+
+    def _list(self, namespace, limit, token):
+        with self._cond:
+            self.list_calls += 1
+            keys = sorted(k for k in self.pods
+                          if namespace is None or k.startswith(namespace + "/"))
+            start = int(token or 0)
+            end = start + limit if limit else len(keys)
+            items = [self.pods[k] for k in keys[start:end]]
+            next_token = str(end) if end < len(keys) else None
+            return _Obj(items=items, metadata=_Obj(_continue=next_token,
+                                                   resource_version=str(self.resource_version)))
+
+
+class FakeWatch:
+    """Subset of kubernetes.watch.Watch backed by FakeCoreV1Api's event history"""
+
+    def __init__(self):
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def stream(self, func, *args, resource_version=None, timeout_seconds=None, **kwargs):
+        api = getattr(func, "__wrapped__", func).__self__
+        namespace = args[0] if args else None
+        since = int(resource_version or 0)
+        deadline = time.monotonic() + (timeout_seconds or 3600)
+        while not self._stopped and time.monotonic() < deadline:
+            with api._cond:
+                oldest = api.events[0][0] if api.events else api.resource_version + 1
+                if since + 1 < oldest and since < api.resource_version:
+                    yield {"type": "ERROR", "object": {"code": 410, "reason": "Expired"}}
+                    return
+                pending = [e for e in api.events if e[0] > since]
+                if not pending:
+                    api._cond.wait(0.05)
+                    continue
+            for rv, event_type, pod in pending:
+                since = rv
+                if namespace is None or pod.metadata.namespace == namespace:
+                    yield {"type": event_type, "object": pod}
+
+
+if __name__ == "__main__":
+    import random
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(name)s - %(message)s")
+
+    # Example 1: Initial Paginated List
+    print("=== Informer Initial Sync ===")
+    api = FakeCoreV1Api()
+    rng = random.Random(0)
+    for i in range(5000):
+        api.upsert(make_pod(rng.choice(["training", "serving", "etl"]), f"pod-{i}",
+                            phase=rng.choice(["Pending", "Running", "Succeeded"]),
+                            labels={"app": rng.choice(["trainer", "api", "spark"])}))
+
+    informer = PodInformer(api, index_labels=("app",), page_size=500,
+                           watch_timeout=5, watch_factory=FakeWatch)
+    informer.start()
+    print(f"Cached {len(informer)} pods with {informer.stats['list_requests']} list requests")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Incremental Watch Events and Indexed Queries
+    print("=== Watch Events and Queries ===")
+    api.upsert(make_pod("training", "bert-finetune-0", phase="Running",
+                        labels={"app": "trainer"}))
+    api.delete("etl", next(k for k in api.pods if k.startswith("etl/")).split("/")[1])
+    time.sleep(0.2)  # let the watch thread apply the events
+
+    start = time.perf_counter()
+    running_training = informer.select(namespace="training", phase="Running",
+                                       labels={"app": "trainer"})
+    lookup_ms = (time.perf_counter() - start) * 1e3
+    print(f"Running training pods: {len(running_training)} (lookup {lookup_ms:.2f} ms, "
+          f"no API call)")
+    print(f"Watch events applied: {informer.stats['events']}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: resourceVersion Expiry (410 Gone) Triggers a Relist
+    print("=== Resync After 410 Gone ===")
+    informer.stop()  # a long disconnect...
+    api.upsert(make_pod("serving", "api-canary", phase="Running", labels={"app": "api"}))
+    api.compact()    # ...during which the server compacted its history
+    informer.start()
+    time.sleep(0.3)
+    print(f"Relists: {informer.stats['relists']}, "
+          f"canary cached: {informer.get('serving', 'api-canary') is not None}")
+    informer.stop()
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 4: Real Cluster
+    print("=== Kubernetes Cluster ===")
+    try:
+        from kubernetes import client, config
+        config.load_kube_config()
+        with PodInformer(client.CoreV1Api(), index_labels=("app", "job-name")) as cluster:
+            print(f"Running pods: {len(cluster.select(phase='Running'))}")
+    except Exception as e:
+        print(f"Kubernetes example (requires kubernetes library and cluster access): {e}")
+
+    print("\n=== Informer Benefits in MLOps ===")
+    print("- One list, then only changes: API server load stays flat")
+    print("- Indexed queries answer 'running training pods' without an API call")
+    print("- 410 Gone and watch failures recover with a full relist")
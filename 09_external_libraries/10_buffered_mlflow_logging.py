@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+"""
+Buffered Asynchronous MLflow Logging for MLOps
+Demonstrates queueing params, metrics and tags in memory and sending
+them with MlflowClient.log_batch from a background thread, flushing
+on batch size or interval, preserving step order and flushing
+everything when the run ends or fails
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-request limits enforced by the MLflow tracking server
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+_FLUSH = object()  # marker: send everything queued before it, then signal
+_CLOSE = object()  # marker: final flush, then stop the thread
+
+
+class BufferedRunLogger:
+    """
+    Non-blocking logger for one MLflow run
+
+    log_* calls only append to an in-memory queue; a single background
+    thread drains it in FIFO order, so metrics reach the store in the
+    order they were logged and each keeps the timestamp of its log call.
+    A failed log_batch is not retried: from then on items are dropped,
+    and counted in stats["dropped"], until the error has been raised by
+    the next log_*/flush/close call; sending resumes after that.
+
+    Args:
+        client: mlflow.tracking.MlflowClient
+        run_id: Run to log into
+        max_batch: Queued items that trigger a send
+        flush_interval: Maximum seconds an item waits before being sent
+    """
+
+    def __init__(self, client, run_id, max_batch=500, flush_interval=2.0):
+        from mlflow.entities import Metric, Param, RunTag
+        self._entities = {"metric": Metric, "param": Param, "tag": RunTag}
+        self.client = client
+        self.run_id = run_id
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.stats = {"items": 0, "batches": 0, "dropped": 0, "send_s": 0.0}
+        self._queue = queue.Queue()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="mlflow-logger", daemon=True)
+        self._thread.start()
+
+    # Logging API (mirrors mlflow.log_*) ------------------------------------------
+
+    def log_metric(self, key, value, step=0, timestamp=None):
+        self._put(("metric", key, float(value), timestamp or _now_ms(), step))
+
+    def log_metrics(self, metrics, step=0):
+        timestamp = _now_ms()
+        for key, value in metrics.items():
+            self._put(("metric", key, float(value), timestamp, step))
+
+    def log_param(self, key, value):
+        self._put(("param", key, str(value)))
+
+    def log_params(self, params):
+        for key, value in params.items():
+            self.log_param(key, value)
+
+    def set_tag(self, key, value):
+        self._put(("tag", key, str(value)))
+
+    def flush(self, timeout=None):
+        """Block until everything logged so far has been sent"""
+        if self._closed:
+            self._raise_if_failed()  # close() already sent everything
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        if not done.wait(timeout):
+            raise TimeoutError(f"MLflow flush did not finish within {timeout}s")
+        self._raise_if_failed()
+
+    def close(self):
+        """Send remaining items and stop the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_CLOSE, None))
+        self._thread.join()
+        self._raise_if_failed()
+
+    # Background thread ------------------------------------------------------------
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("Logger is closed")
+        self._raise_if_failed()
+        self._queue.put(item)
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Background MLflow logging failed") from error
+
+    def _run(self):
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # interval elapsed
+
+            if item is not None and item[0] not in (_FLUSH, _CLOSE):
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(pending) < self.max_batch:
+                    continue
+
+            self._send(pending)
+            pending, deadline = [], None
+            if item is not None and item[0] is _FLUSH:
+                item[1].set()
+            elif item is not None and item[0] is _CLOSE:
+                return
+
+    def _send(self, items):
+        """log_batch in chunks that respect the server's per-request limits"""
+        if not items:
+            return
+        if self._error is not None:
+            self.stats["dropped"] += len(items)  # caller has not seen the failure yet
+            return
+        metrics, params, tags = [], [], []
+        for kind, key, *rest in items:
+            if kind == "metric":
+                value, timestamp, step = rest
+                metrics.append(self._entities["metric"](key, value, timestamp, step))
+            elif kind == "param":
+                params.append(self._entities["param"](key, rest[0]))
+            else:
+                tags.append(self._entities["tag"](key, rest[0]))
+
+        start = time.perf_counter()
+        sent = 0
+        try:
+            while metrics or params or tags:
+                batch_params, params = params[:MAX_PARAMS_PER_BATCH], params[MAX_PARAMS_PER_BATCH:]
+                batch_tags, tags = tags[:MAX_TAGS_PER_BATCH], tags[MAX_TAGS_PER_BATCH:]
+                room = MAX_METRICS_PER_BATCH - len(batch_params) - len(batch_tags)
+                batch_metrics, metrics = metrics[:room], metrics[room:]
+                self.client.log_batch(self.run_id, metrics=batch_metrics,
+                                      params=batch_params, tags=batch_tags)
+                self.stats["batches"] += 1
+                sent += len(batch_metrics) + len(batch_params) + len(batch_tags)
+        except Exception as e:
+            self._error = e  # surfaced on the next log/flush/close call
+            self.stats["dropped"] += len(items) - sent
+        self.stats["items"] += sent
+        self.stats["send_s"] += time.perf_counter() - start
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+@contextmanager
+def buffered_run(client=None, experiment_id="0", run_name=None, **logger_kwargs):
+    """
+    Create a run and yield a BufferedRunLogger for it
+
+    Everything queued is flushed before the run is marked FINISHED, or
+    FAILED if the body raised, so no metrics are lost on crashes. If the
+    body raised, that exception propagates even when the final flush
+    also fails.
+    """
+    if client is None:
+        from mlflow.tracking import MlflowClient
+        client = MlflowClient()
+    run = client.create_run(experiment_id, run_name=run_name)
+    logger = BufferedRunLogger(client, run.info.run_id, **logger_kwargs)
+    try:
+        yield logger
+    except BaseException:
+        try:
+            logger.close()
+        except Exception:
+            pass  # do not mask the body's exception with a flush error
+        finally:
+            client.set_terminated(run.info.run_id, "FAILED")
+        raise
+    try:
+        logger.close()
+    except Exception:
+        client.set_terminated(run.info.run_id, "FAILED")  # the final flush failed
+        raise
+    client.set_terminated(run.info.run_id, "FINISHED")
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    # Example 1: Per-Call vs Buffered Logging Against a File Store
+    # The file store stands in for a tracking server; each call is a round-trip
+    print("=== Per-Call vs Buffered Logging ===")
+    try:
+        from mlflow.tracking import MlflowClient
+
+        tracking_dir = tempfile.mkdtemp()
+        client = MlflowClient(tracking_uri=f"file://{tracking_dir}")
+        experiment_id = client.create_experiment("buffered-logging")
+        steps = 500
+
+        run = client.create_run(experiment_id, run_name="per-call")
+        start = time.perf_counter()
+        for step in range(steps):
+            client.log_metric(run.info.run_id, "loss", 1.0 / (step + 1), step=step)
+        client.set_terminated(run.info.run_id)
+        print(f"Per-call: {steps} metrics in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        with buffered_run(client, experiment_id, run_name="buffered") as logger:
+            logger.log_params({"learning_rate": 0.01, "batch_size": 64})
+            logger.set_tag("stage", "demo")
+            for step in range(steps):
+                logger.log_metric("loss", 1.0 / (step + 1), step=step)
+            blocked_s = time.perf_counter() - start  # time the training loop was held up
+        print(f"Buffered: training loop blocked {blocked_s * 1e3:.1f} ms, "
+              f"{time.perf_counter() - start:.2f}s including final flush, "
+              f"{logger.stats['batches']} log_batch calls")
+
+        history = client.get_metric_history(logger.run_id, "loss")
+        in_order = [m.step for m in history] == list(range(steps))
+        print(f"Stored {len(history)} points, step order preserved: {in_order}")
+
+        print("\n" + "="*50 + "\n")
+
+        # Example 2: Flush on Failure
+        # A crashing run still records every metric logged before the crash
+        print("=== Flush on Exception ===")
+        try:
+            with buffered_run(client, experiment_id, run_name="crashing",
+                              flush_interval=60) as logger:
+                for step in range(10):
+                    logger.log_metric("loss", 0.5, step=step)
+                raise RuntimeError("CUDA out of memory")
+        except RuntimeError as e:
+            print(f"Run failed: {e}")
+        run = client.get_run(logger.run_id)
+        print(f"Status: {run.info.status}, "
+              f"points stored: {len(client.get_metric_history(logger.run_id, 'loss'))}")
+
+        shutil.rmtree(tracking_dir, ignore_errors=True)
+    except ImportError as e:
+        print(f"MLflow buffered logging example (requires mlflow library): {e}")
+
+    print("\n=== Buffered Logging Benefits in MLOps ===")
+    print("- Training steps never wait on a tracking-server round-trip")
+    print("- log_batch sends hundreds of metrics per request")
+    print("- Failed runs keep every metric logged before the failure")
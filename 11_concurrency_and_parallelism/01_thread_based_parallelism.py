@@ -25,6 +25,7 @@ print(f"Starting concurrent download of {len(tasks)} files...")
 start_time = time.time()
 
 # Create and start threads for concurrent downloads
+# (one thread per file does not scale to thousands of files; see 06_download_manager.py)
 threads = []
 for name, sec in tasks:
     # Create thread for each download task
@@ -58,6 +58,8 @@ print("=== Process-Safe Queue Example ===")
 
 def worker(q):
     """Worker process - handles ML computation tasks"""
+    # Note: empty() is only a snapshot, so this loop can exit early or block;
+    # see 13_batched_queue.py for a close/sentinel protocol
     while not q.empty():
         try:
             item = q.get(timeout=1)  # Get with timeout to avoid hanging
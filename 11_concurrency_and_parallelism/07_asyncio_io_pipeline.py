@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+"""
+asyncio I/O Pipeline for MLOps
+Demonstrates running tens of thousands of concurrent I/O tasks on one
+thread with asyncio: semaphore-bounded concurrency, per-task timeouts,
+blocking callables offloaded to an executor, and a benchmark comparing
+threads and asyncio at 100, 1k and 10k tasks (wall time, memory, CPU)
+
+Run with:
+    python 11_concurrency_and_parallelism/07_asyncio_io_pipeline.py --tasks 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskOutcome:
+    """Result of one task: value on success, error otherwise"""
+
+    def __init__(self, item, value=None, error=None, duration_s=0.0):
+        self.item = item
+        self.value = value
+        self.error = error
+        self.duration_s = duration_s
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"TaskOutcome(item={self.item!r}, {status}, duration_s={self.duration_s:.3f})"
+
+
+async def _timed(func, item, timeout):
+    start = time.perf_counter()
+    try:
+        value = await asyncio.wait_for(func(item), timeout)
+        return TaskOutcome(item, value=value, duration_s=time.perf_counter() - start)
+    except Exception as e:
+        # TimeoutError is an Exception; CancelledError is not and propagates
+        return TaskOutcome(item, error=e, duration_s=time.perf_counter() - start)
+
+
+async def bounded_gather(func, items, limit=100, timeout=None):
+    """
+    Run func(item) coroutines with at most `limit` in flight
+
+    Args:
+        func: async function taking one item
+        items: Iterable of inputs
+        limit: Semaphore size (concurrent tasks doing I/O)
+        timeout: Per-task timeout in seconds; slow tasks become
+            TimeoutError outcomes instead of stalling the batch
+
+    Returns:
+        list of TaskOutcome in input order (failures do not cancel others)
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_one(item):
+        async with semaphore:
+            return await _timed(func, item, timeout)
+
+    return await asyncio.gather(*(run_one(item) for item in items))
+
+
+async def run_blocking(func, *args, executor=None):
+    """Run a blocking callable (file I/O, C extension, legacy SDK) off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+async def pipeline(sources, fetch, parse, fetch_limit=100, parse_workers=4, timeout=None,
+                   buffer_size=None):
+    """
+    Two-stage pipeline: async fetch -> blocking parse in a thread pool
+
+    Stages overlap: parsing starts as soon as the first fetch finishes.
+    fetch_limit fetcher coroutines pull sources lazily and each waits for
+    room in a bounded queue before fetching again, so at most
+    fetch_limit + buffer_size payloads are fetched but not yet parsed.
+    Fetch and parse errors both become error outcomes, so one bad
+    payload does not abort the batch.
+    """
+    queue = asyncio.Queue(maxsize=buffer_size or fetch_limit * 2)
+    items = iter(sources)
+    results = []
+    done = object()
+
+    async def fetcher():
+        # The iterator is shared; next() never interleaves on one event loop
+        for item in items:
+            outcome = await _timed(fetch, item, timeout)
+            await queue.put(outcome)  # waits while the parsers are behind
+
+    async def producer():
+        await asyncio.gather(*(fetcher() for _ in range(fetch_limit)))
+        for _ in range(parse_workers):
+            await queue.put(done)
+
+    async def parser(executor):
+        while (outcome := await queue.get()) is not done:
+            if outcome.ok:
+                start = time.perf_counter()
+                try:
+                    outcome.value = await run_blocking(parse, outcome.value, executor=executor)
+                except Exception as e:
+                    outcome.value, outcome.error = None, e
+                outcome.duration_s += time.perf_counter() - start
+            results.append(outcome)
+
+    with ThreadPoolExecutor(max_workers=parse_workers) as executor:
+        await asyncio.gather(producer(), *(parser(executor) for _ in range(parse_workers)))
+    return results
+
+
+# Benchmark --------------------------------------------------------------------------
+# Each case runs in a fresh interpreter so peak RSS is not polluted by earlier cases
+
+def _simulated_io_sync(seconds):
+    time.sleep(seconds)
+
+
+async def _simulated_io_async(seconds):
+    await asyncio.sleep(seconds)
+
+
+def _run_case(model, n_tasks, io_seconds, limit):
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    if model == "threads":
+        with ThreadPoolExecutor(max_workers=min(limit, n_tasks)) as executor:
+            list(executor.map(_simulated_io_sync, [io_seconds] * n_tasks))
+    else:
+        asyncio.run(bounded_gather(_simulated_io_async, [io_seconds] * n_tasks, limit))
+    return {
+        "model": model,
+        "tasks": n_tasks,
+        "limit": limit,
+        "wall_s": round(time.perf_counter() - start_wall, 3),
+        "cpu_s": round(time.process_time() - start_cpu, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_benchmark(task_counts, io_seconds=0.1, limit=None):
+    """Threads vs asyncio for each task count; limit=None means fully concurrent"""
+    results = []
+    for n_tasks in task_counts:
+        for model in ("threads", "asyncio"):
+            proc = subprocess.run(
+                [sys.executable, __file__, "--case", model, str(n_tasks),
+                 "--io-seconds", str(io_seconds), "--limit", str(limit or n_tasks)],
+                capture_output=True, text=True)
+            if proc.returncode != 0:
+                # e.g. "can't start new thread" when the OS thread limit is hit
+                error = proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+                result = {"model": model, "tasks": n_tasks, "error": error}
+            else:
+                result = json.loads(proc.stdout)
+            results.append(result)
+            print(format_row(result), flush=True)
+    return results
+
+
+COLUMNS = [("model", 8), ("tasks", 7), ("limit", 7), ("wall_s", 8), ("cpu_s", 7),
+           ("peak_rss_mb", 12)]
+
+
+def format_header():
+    header = " ".join(f"{name:>{width}}" for name, width in COLUMNS)
+    return header + "\n" + "-" * len(header)
+
+
+def format_row(result):
+    if "error" in result:
+        return f"{result['model']:>8} {result['tasks']:>7}  error: {result['error']}"
+    return " ".join(f"{result[name]:>{width}}" for name, width in COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark threads vs asyncio for I/O tasks")
+    parser.add_argument("--tasks", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--io-seconds", type=float, default=0.1,
+                        help="Simulated I/O latency per task")
+    parser.add_argument("--limit", type=int,
+                        help="Max concurrent tasks (default: all tasks at once)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--case", nargs=2, metavar=("MODEL", "TASKS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:  # child process started by run_benchmark
+        model, n_tasks = args.case
+        print(json.dumps(_run_case(model, int(n_tasks), args.io_seconds, args.limit)))
+        return None
+
+    print("=== Threads vs asyncio Benchmark ===")
+    print(format_header())
+    results = run_benchmark(args.tasks, args.io_seconds, args.limit)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return results
+
+
+async def _demo():
+    # Example 1: Semaphore-Bounded Concurrency With Timeouts
+    # 1000 simulated model-registry lookups, 200 at a time, 0.5s budget each
+    print("=== Bounded Concurrency and Timeouts ===")
+
+    async def lookup(i):
+        await asyncio.sleep(1.0 if i % 100 == 0 else 0.05)  # every 100th call hangs
+        return {"model": f"model-{i}", "version": i % 7}
+
+    start = time.perf_counter()
+    outcomes = await bounded_gather(lookup, range(1000), limit=200, timeout=0.5)
+    timed_out = sum(isinstance(o.error, asyncio.TimeoutError) for o in outcomes)
+    print(f"{len(outcomes)} lookups in {time.perf_counter() - start:.2f}s, "
+          f"{timed_out} timed out, first: {outcomes[1]}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Async Fetch + Blocking Parse Pipeline
+    # Blocking work runs in a thread pool so the event loop keeps serving fetches
+    print("=== Fetch/Parse Pipeline ===")
+
+    async def fetch(i):
+        await asyncio.sleep(0.02)
+        if i % 500 == 0:
+            return "{truncated"  # corrupt payload: fails in parse, not in fetch
+        return json.dumps({"id": i, "features": list(range(50))})
+
+    def parse(payload):
+        return sum(json.loads(payload)["features"])  # blocking CPU/IO work
+
+    start = time.perf_counter()
+    results = await pipeline(range(2000), fetch, parse, fetch_limit=500, parse_workers=4)
+    failed = [r for r in results if not r.ok]
+    print(f"Processed {len(results)} records in {time.perf_counter() - start:.2f}s "
+          f"(sequential fetches alone would take {2000 * 0.02:.0f}s), "
+          f"{len(failed)} bad payloads, e.g. {failed[0] if failed else None}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Backpressure From Slow Parsers
+    # Fetched-but-unparsed payloads stay within fetch_limit + buffer_size
+    print("=== Pipeline Backpressure ===")
+    counts = {"fetched": 0, "parsing": 0, "peak": 0}
+
+    async def counted_fetch(i):
+        payload = await fetch(i)
+        counts["fetched"] += 1
+        counts["peak"] = max(counts["peak"], counts["fetched"] - counts["parsing"])
+        return payload
+
+    def slow_parse(payload):
+        counts["parsing"] += 1  # picked up by a parser
+        time.sleep(0.01)  # parsers are the bottleneck: 200/s vs 500/s fetched
+        return payload
+
+    await pipeline(range(500), counted_fetch, slow_parse, fetch_limit=10, parse_workers=2,
+                   buffer_size=20)
+    print(f"Peak fetched but not yet parsed: {counts['peak']} "
+          f"(bound: 10 + 20 = 30, within bound: {counts['peak'] <= 30})")
+
+
+if __name__ == "__main__":
+    if "--case" in sys.argv:
+        main()  # one benchmark case in a child process
+        sys.exit(0)
+
+    asyncio.run(_demo())
+    print("\n" + "="*50 + "\n")
+    main()
+
+    print("\n=== asyncio Benefits in MLOps ===")
+    print("- One thread drives thousands of concurrent network calls")
+    print("- Memory per task is a few KB instead of a thread stack")
+    print("- Timeouts and bounded concurrency are first-class")
+    print("- Blocking libraries still fit via run_in_executor")
@@ -0,0 +1,393 @@
+#!/usr/bin/python3
+"""
+DAG Task Scheduler for MLOps
+Demonstrates running pipeline DAGs (download -> validate -> featurize ->
+train -> evaluate) on top of concurrent.futures: declared dependencies,
+per-task CPU/memory requirements, thread or process executors per task,
+critical-path-first ordering, memoized results for incremental re-runs
+and a per-task timeline trace for finding bottlenecks
+"""
+
+import functools
+import hashlib
+import heapq
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+logger = logging.getLogger("dag_scheduler")
+
+
+class Task:
+    """One node of the DAG"""
+
+    def __init__(self, name, func, deps=(), cpus=1, memory_mb=0, executor="thread",
+                 estimate_s=1.0, version="1"):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}' (expected 'thread' or 'process')")
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.executor = executor
+        self.estimate_s = estimate_s  # used for critical-path priority
+        self.version = version        # bump to invalidate memoized results
+
+
+class DAGScheduler:
+    """
+    Resource-aware parallel DAG executor
+
+    Each task runs as func(*dependency_results) once all its dependencies
+    have succeeded and its CPU/memory requirement fits in what is free.
+    Among ready tasks, the one with the longest remaining critical path
+    runs first, so long chains start early and do not set the makespan.
+
+    Args:
+        cpus: CPU slots shared by all running tasks
+        memory_mb: Memory budget shared by all running tasks
+        cache_dir: Directory for memoized results (None disables caching)
+    """
+
+    def __init__(self, cpus=None, memory_mb=16 * 1024, cache_dir=None):
+        self.cpus = cpus or os.cpu_count()
+        self.memory_mb = memory_mb
+        self.cache_dir = cache_dir
+        self.tasks = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def add(self, name, func, deps=(), **kwargs):
+        """Register a task; see Task for cpus, memory_mb, executor, estimate_s, version"""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task '{name}'")
+        self.tasks[name] = Task(name, func, deps, **kwargs)
+        return self
+
+    # Graph analysis ----------------------------------------------------------------
+
+    def topological_order(self):
+        """Kahn's algorithm; raises ValueError on unknown dependencies or cycles"""
+        indegree = {name: 0 for name in self.tasks}
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task '{task.name}' depends on unknown task '{dep}'")
+                indegree[task.name] += 1
+        successors = self._successors()
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for succ in successors[name]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    ready.append(succ)
+        if len(order) != len(self.tasks):
+            cycle = sorted(name for name, degree in indegree.items() if degree > 0)
+            raise ValueError(f"Dependency cycle among: {cycle}")
+        return order
+
+    def critical_path_lengths(self):
+        """Estimated seconds from each task's start to the end of the DAG"""
+        successors = self._successors()
+        lengths = {}
+        for name in reversed(self.topological_order()):
+            tail = max((lengths[s] for s in successors[name]), default=0.0)
+            lengths[name] = self.tasks[name].estimate_s + tail
+        return lengths
+
+    def _successors(self):
+        successors = {name: [] for name in self.tasks}
+        for task in self.tasks.values():
+            for dep in task.deps:
+                successors.setdefault(dep, []).append(task.name)
+        return successors
+
+    # Memoization ---------------------------------------------------------------------
+
+    def cache_keys(self):
+        """Key per task from its name, version, function and upstream keys"""
+        keys = {}
+        for name in self.topological_order():
+            task = self.tasks[name]
+            material = json.dumps([name, task.version, _func_id(task.func),
+                                   [keys[d] for d in task.deps]])
+            keys[name] = hashlib.sha256(material.encode()).hexdigest()[:16]
+        return keys
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _load_cached(self, key):
+        if not self.cache_dir:
+            return False, None
+        try:
+            with open(self._cache_path(key), "rb") as f:
+                return True, pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def _store_cached(self, name, key, value):
+        """Memoize a result; unpicklable results are logged and not cached"""
+        if not self.cache_dir:
+            return
+        tmp = self._cache_path(key) + f".{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # The task itself succeeded; only memoization is skipped
+            logger.warning("Not caching result of task %s: %s", name, e)
+            os.remove(tmp)
+            return
+        os.replace(tmp, self._cache_path(key))
+
+    # Execution -------------------------------------------------------------------------
+
+    def run(self, targets=None):
+        """
+        Execute the DAG (or just what `targets` need)
+
+        Returns:
+            RunReport with results, per-task status and the timeline trace
+        """
+        for task in self.tasks.values():
+            if task.cpus > self.cpus or task.memory_mb > self.memory_mb:
+                raise ValueError(f"Task '{task.name}' needs {task.cpus} CPUs/{task.memory_mb} MB, "
+                                 f"more than the scheduler has ({self.cpus}/{self.memory_mb})")
+        needed = self._needed(targets)
+        priority = self.critical_path_lengths()
+        keys = self.cache_keys()
+        successors = self._successors()
+        remaining = {name: sum(d in needed for d in self.tasks[name].deps) for name in needed}
+
+        report = RunReport()
+        ready = []
+        free_cpus, free_memory = self.cpus, self.memory_mb
+        running = {}  # future -> (task, start)
+        start_time = time.perf_counter()
+
+        def mark_ready(name):
+            heapq.heappush(ready, (-priority[name], name))
+
+        def finish(name, status, value=None):
+            report.status[name] = status
+            if status in ("done", "cached"):
+                report.results[name] = value
+                for succ in successors[name]:
+                    if succ in remaining:
+                        remaining[succ] -= 1
+                        if remaining[succ] == 0:
+                            mark_ready(succ)
+            else:
+                for succ in successors[name]:  # downstream of a failure never runs
+                    if succ in remaining and succ not in report.status:
+                        finish(succ, "skipped")
+
+        for name in needed:
+            if remaining[name] == 0:
+                mark_ready(name)
+
+        with ThreadPoolExecutor(max_workers=self.cpus) as threads, \
+                ProcessPoolExecutor(max_workers=self.cpus) as processes:
+            executors = {"thread": threads, "process": processes}
+            while ready or running:
+                # Dispatch in critical-path order; smaller tasks backfill free slots
+                deferred = []
+                while ready:
+                    item = heapq.heappop(ready)
+                    task = self.tasks[item[1]]
+                    hit, value = self._load_cached(keys[task.name])
+                    if hit:
+                        now = time.perf_counter() - start_time
+                        report.trace.append(_event(task, now, now, "cached"))
+                        finish(task.name, "cached", value)
+                        continue
+                    if task.cpus <= free_cpus and task.memory_mb <= free_memory:
+                        free_cpus -= task.cpus
+                        free_memory -= task.memory_mb
+                        args = [report.results[d] for d in task.deps]
+                        future = executors[task.executor].submit(task.func, *args)
+                        running[future] = (task, time.perf_counter() - start_time)
+                    else:
+                        deferred.append(item)
+                for item in deferred:
+                    heapq.heappush(ready, item)
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, started = running.pop(future)
+                    free_cpus += task.cpus
+                    free_memory += task.memory_mb
+                    ended = time.perf_counter() - start_time
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        report.errors[task.name] = e
+                        report.trace.append(_event(task, started, ended, "failed"))
+                        finish(task.name, "failed")
+                        continue
+                    self._store_cached(task.name, keys[task.name], value)
+                    report.trace.append(_event(task, started, ended, "done"))
+                    finish(task.name, "done", value)
+
+        report.makespan_s = time.perf_counter() - start_time
+        return report
+
+    def _needed(self, targets):
+        """Targets plus all their transitive dependencies"""
+        if targets is None:
+            return set(self.topological_order())
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.tasks[name].deps)
+        return needed
+
+
+def _func_id(func):
+    """Stable identity of a callable, including functools.partial arguments"""
+    if isinstance(func, functools.partial):
+        return f"{_func_id(func.func)}{func.args!r}{sorted(func.keywords.items())!r}"
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _event(task, start, end, status):
+    return {"task": task.name, "executor": task.executor, "cpus": task.cpus,
+            "start_s": round(start, 3), "end_s": round(end, 3),
+            "duration_s": round(end - start, 3), "status": status}
+
+
+class RunReport:
+    """Results, per-task status (done/cached/failed/skipped) and timeline"""
+
+    def __init__(self):
+        self.results = {}
+        self.status = {}
+        self.errors = {}
+        self.trace = []
+        self.makespan_s = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def timeline(self, width=60):
+        """ASCII Gantt chart of the trace"""
+        scale = width / self.makespan_s if self.makespan_s else 0
+        name_width = max((len(e["task"]) for e in self.trace), default=4)
+        lines = []
+        for e in sorted(self.trace, key=lambda e: e["start_s"]):
+            offset = int(e["start_s"] * scale)
+            bar = "#" * max(1, int(e["duration_s"] * scale)) if e["status"] != "cached" else "c"
+            lines.append(f"{e['task']:<{name_width}} |{' ' * offset}{bar:<{width - offset}}| "
+                         f"{e['duration_s']:.2f}s {e['status']}")
+        return "\n".join(lines)
+
+    def bottlenecks(self, top=3):
+        """Longest-running tasks: the first places to optimize"""
+        return sorted(self.trace, key=lambda e: -e["duration_s"])[:top]
+
+    def to_chrome_trace(self, path):
+        """Write the trace for chrome://tracing or Perfetto"""
+        events = [{"name": e["task"], "ph": "X", "ts": e["start_s"] * 1e6,
+                   "dur": e["duration_s"] * 1e6, "pid": 0, "tid": e["executor"],
+                   "args": {"status": e["status"], "cpus": e["cpus"]}} for e in self.trace]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events}, f)
+
+
+# Example pipeline stages -------------------------------------------------------------
+# Module-level functions so they can also run on the process executor
+
+def download(shard):
+    time.sleep(0.3)  # network I/O
+    return list(range(shard * 1000, (shard + 1) * 1000))
+
+
+def validate(*shards):
+    time.sleep(0.1)
+    return [x for shard in shards for x in shard if x >= 0]
+
+
+def featurize(rows):
+    return [sum(i * i for i in range(x % 200)) for x in rows]  # CPU-bound
+
+
+def train(features):
+    time.sleep(0.5)
+    return {"weights": sum(features) / len(features)}
+
+
+def evaluate(model, features):
+    time.sleep(0.1)
+    return {"accuracy": 0.9, "weights": round(model["weights"], 2)}
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    cache_dir = tempfile.mkdtemp()
+
+    def pipeline(train_version="1"):
+        dag = DAGScheduler(cpus=4, memory_mb=8192, cache_dir=cache_dir)
+        for shard in range(4):
+            dag.add(f"download_{shard}", functools.partial(download, shard), estimate_s=0.3)
+        dag.add("validate", validate, [f"download_{s}" for s in range(4)], estimate_s=0.1)
+        dag.add("featurize", featurize, ["validate"], executor="process", cpus=2,
+                memory_mb=4096, estimate_s=1.0)
+        dag.add("train", train, ["featurize"], cpus=4, memory_mb=6144, estimate_s=0.5,
+                version=train_version)
+        dag.add("evaluate", evaluate, ["train", "featurize"], estimate_s=0.1)
+        return dag
+
+    # Example 1: Dependency-Ordered Parallel Run With Timeline
+    print("=== DAG Run ===")
+    dag = pipeline()
+    print(f"Critical path estimates: {dag.critical_path_lengths()}")
+    report = dag.run()
+    print(f"Makespan: {report.makespan_s:.2f}s, result: {report.results['evaluate']}")
+    print(report.timeline())
+    print(f"Bottlenecks: {[(e['task'], e['duration_s']) for e in report.bottlenecks()]}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Incremental Re-Run
+    # Only train (new version) and its downstream tasks execute; the rest is cached
+    print("=== Incremental Re-Run ===")
+    report = pipeline(train_version="2").run()
+    print(f"Makespan: {report.makespan_s:.2f}s, status: {report.status}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Failure Handling
+    print("=== Failed Task ===")
+
+    def broken_validate(*shards):
+        raise ValueError("schema mismatch in shard 2")
+
+    dag = pipeline(train_version="3")
+    dag.tasks["validate"].func = broken_validate
+    dag.tasks["validate"].version = "broken"
+    report = dag.run()
+    print(f"Errors: {report.errors}")
+    print(f"Status: {report.status}")
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("\n=== DAG Scheduler Benefits in MLOps ===")
+    print("- Independent stages run in parallel as soon as inputs are ready")
+    print("- CPU/memory budgets keep heavy stages from oversubscribing the host")
+    print("- Critical-path ordering shortens end-to-end pipeline time")
+    print("- Memoized nodes make re-runs after a small change cheap")
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+"""
+Async Subprocess Runner for MLOps
+Demonstrates launching hundreds of preprocessing CLIs with
+asyncio.create_subprocess_exec: a concurrency limit, non-blocking line
+streaming of both stdout and stderr (no full-pipe deadlocks),
+per-process timeouts with SIGTERM -> SIGKILL escalation and structured
+results with exit code, duration and the tail of each stream
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from collections import deque
+
+
+class ProcessResult:
+    """Outcome of one command"""
+
+    def __init__(self, name, args, pid, exit_code, duration_s, stdout_tail, stderr_tail,
+                 timed_out=False, killed=False):
+        self.name = name
+        self.args = args
+        self.pid = pid
+        self.exit_code = exit_code
+        self.duration_s = duration_s
+        self.stdout_tail = stdout_tail
+        self.stderr_tail = stderr_tail
+        self.timed_out = timed_out
+        self.killed = killed  # True if SIGTERM was ignored and SIGKILL was needed
+
+    @property
+    def ok(self):
+        return self.exit_code == 0 and not self.timed_out
+
+    def __repr__(self):
+        return (f"ProcessResult(name={self.name!r}, exit_code={self.exit_code}, "
+                f"duration_s={self.duration_s:.2f}, timed_out={self.timed_out})")
+
+
+class AsyncProcessRunner:
+    """
+    Run many external commands concurrently
+
+    Args:
+        max_concurrency: Processes running at once
+        timeout: Default per-process timeout in seconds (None = no limit)
+        kill_grace: Seconds between SIGTERM and SIGKILL after a timeout
+        tail_lines: Lines of stdout/stderr kept in each result
+        on_line: Optional callback(name, stream, line) for live output
+        line_limit: Longest line kept; longer lines are replaced by a marker
+    """
+
+    def __init__(self, max_concurrency=8, timeout=None, kill_grace=5.0, tail_lines=50,
+                 on_line=None, line_limit=1024 * 1024):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.kill_grace = kill_grace
+        self.tail_lines = tail_lines
+        self.on_line = on_line
+        self.line_limit = line_limit
+        self._semaphore = None
+
+    async def run(self, args, name=None, timeout=None, env=None, cwd=None):
+        """Run one command under the concurrency limit"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        name = name or os.path.basename(str(args[0]))
+        timeout = self.timeout if timeout is None else timeout
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.DEVNULL, env=env, cwd=cwd, limit=self.line_limit,
+                start_new_session=True)  # own process group: timeouts kill grandchildren too
+            tails = {"stdout": deque(maxlen=self.tail_lines),
+                     "stderr": deque(maxlen=self.tail_lines)}
+            # Both pipes are drained concurrently, so neither can fill up and block the child
+            readers = [asyncio.create_task(self._pump(proc.stdout, name, "stdout", tails)),
+                       asyncio.create_task(self._pump(proc.stderr, name, "stderr", tails))]
+            state = self._process_started(proc, name)
+
+            timed_out = killed = False
+            try:
+                await asyncio.wait_for(proc.wait(), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                killed = await self._terminate(proc)
+            except asyncio.CancelledError:
+                await self._terminate(proc)
+                raise
+            finally:
+                await asyncio.gather(*readers, return_exceptions=True)
+
+            result = ProcessResult(name, list(args), proc.pid, proc.returncode,
+                                   time.perf_counter() - start, "\n".join(tails["stdout"]),
+                                   "\n".join(tails["stderr"]), timed_out, killed)
+            return self._process_finished(state, result)
+
+    async def run_many(self, commands, **kwargs):
+        """
+        Run commands concurrently; results come back in input order
+
+        Each command is an argument list or a (name, args) pair.
+        """
+        tasks = []
+        for command in commands:
+            is_pair = len(command) == 2 and isinstance(command[1], (list, tuple))
+            name, args = command if is_pair else (None, command)
+            tasks.append(self.run(args, name=name, **kwargs))
+        return await asyncio.gather(*tasks)
+
+    def _process_started(self, proc, name):
+        """Subclass hook (e.g. resource monitoring); returns state for _process_finished"""
+        return None
+
+    def _process_finished(self, state, result):
+        return result
+
+    async def _pump(self, stream, name, stream_name, tails):
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                line = b"[line longer than line_limit truncated]\n"
+            if not line:
+                return
+            text = line.decode(errors="replace").rstrip("\n")
+            tails[stream_name].append(text)
+            if self.on_line is not None:
+                self.on_line(name, stream_name, text)
+
+    async def _terminate(self, proc):
+        """SIGTERM the process group, then SIGKILL after kill_grace; True if killed"""
+        if proc.returncode is not None:
+            return False
+        _signal_group(proc.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), self.kill_grace)
+            return False
+        except asyncio.TimeoutError:
+            _signal_group(proc.pid, signal.SIGKILL)
+            await proc.wait()
+            return True
+
+
+def _signal_group(pid, sig):
+    try:
+        os.killpg(pid, sig)  # pgid == pid because of start_new_session=True
+    except ProcessLookupError:
+        pass
+
+
+def run_commands(commands, **runner_kwargs):
+    """Synchronous entry point for scripts that are not async"""
+    return asyncio.run(AsyncProcessRunner(**runner_kwargs).run_many(commands))
+
+
+if __name__ == "__main__":
+    python = sys.executable
+
+    # Example 1: Many CLIs With a Concurrency Limit
+    # Each "preprocessing tool" writes 200 KB to stderr, which would deadlock
+    # a reader that only drains stdout once the 64 KB pipe buffer fills
+    print("=== Concurrent Preprocessing Commands ===")
+    script = ("import sys, time; time.sleep(0.2); "
+              "sys.stderr.write('warning: deprecated column\\n' * 8000); "
+              "print(f'processed shard {sys.argv[1]}')")
+    commands = [(f"shard-{i}", [python, "-c", script, str(i)]) for i in range(40)]
+    start = time.perf_counter()
+    results = run_commands(commands, max_concurrency=8, tail_lines=2)
+    print(f"{len(results)} commands in {time.perf_counter() - start:.2f}s "
+          f"(sequential: ~{len(commands) * 0.2:.0f}s + startup), "
+          f"all ok: {all(r.ok for r in results)}")
+    print(f"First result: {results[0]}, stdout tail: {results[0].stdout_tail!r}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Live Line Streaming From Both Pipes
+    print("=== Streaming stdout and stderr ===")
+    trainer = ("import sys, time\n"
+               "for epoch in range(3):\n"
+               "    print(f'epoch {epoch} loss={1 / (epoch + 1):.3f}', flush=True)\n"
+               "    print(f'epoch {epoch} gpu memory high', file=sys.stderr, flush=True)\n"
+               "    time.sleep(0.2)\n")
+    runner = AsyncProcessRunner(
+        on_line=lambda name, stream, line: print(f"  [{name}:{stream}] {line}"))
+    result = asyncio.run(runner.run([python, "-c", trainer], name="train"))
+    print(f"Result: {result}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Timeout With Kill Escalation
+    # The child ignores SIGTERM, so SIGKILL follows after the grace period
+    print("=== Timeout and Kill Escalation ===")
+    stubborn = ("import signal, time\n"
+                "signal.signal(signal.SIGTERM, lambda *a: print('ignoring SIGTERM', flush=True))\n"
+                "print('started', flush=True)\n"
+                "while True: time.sleep(1)\n")
+    result = asyncio.run(AsyncProcessRunner(timeout=1.0, kill_grace=0.5).run(
+        [python, "-c", stubborn], name="stuck-job"))
+    print(f"{result}, killed: {result.killed}, stdout: {result.stdout_tail!r}")
+
+    print("\n=== Async Subprocess Benefits in MLOps ===")
+    print("- Hundreds of external tools run concurrently from one thread")
+    print("- stdout and stderr are both drained, so full pipes never deadlock")
+    print("- Hung tools are terminated, then killed, with their process group")
+    print("- Structured results make failures easy to report and retry")
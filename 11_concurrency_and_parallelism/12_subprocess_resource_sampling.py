@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+"""
+Subprocess Resource Sampling for MLOps
+Demonstrates monitoring training scripts launched with subprocess by
+sampling each child's whole process tree from /proc: CPU time, RSS,
+peak RSS and I/O bytes at a configurable interval, reported as a time
+series and a summary, with the sampler's own CPU overhead measured
+"""
+
+import importlib
+import os
+import subprocess
+import threading
+import time
+
+# Reuse the async runner from the previous example for the monitored mode
+runner = importlib.import_module("11_async_subprocess_runner")
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode()
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return None
+
+
+def read_stat(pid):
+    """(ppid, cpu_seconds, rss_bytes) from /proc/<pid>/stat, or None if gone"""
+    text = _read(f"/proc/{pid}/stat")
+    if text is None:
+        return None
+    fields = text[text.rindex(")") + 2:].split()  # comm may contain spaces and ')'
+    ppid = int(fields[1])
+    cpu_s = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+    rss = int(fields[21]) * _PAGE_SIZE
+    return ppid, cpu_s, rss
+
+
+def read_peak_rss(pid):
+    """VmHWM: the process's own high-water mark, catches spikes between samples"""
+    text = _read(f"/proc/{pid}/status")
+    if text:
+        for line in text.splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def read_io(pid):
+    """(read_bytes, write_bytes) actually hitting storage; (0, 0) if not permitted"""
+    text = _read(f"/proc/{pid}/io")
+    values = {}
+    for line in (text or "").splitlines():
+        key, _, value = line.partition(":")
+        values[key] = int(value)
+    return values.get("read_bytes", 0), values.get("write_bytes", 0)
+
+
+def _children(pid):
+    """Direct children from /proc/<pid>/task/*/children; None if the kernel lacks it"""
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except FileNotFoundError:
+        return []  # exited
+    children = []
+    for tid in tids:
+        text = _read(f"/proc/{pid}/task/{tid}/children")
+        if text is None:
+            if not os.path.exists(f"/proc/{pid}/task/{tid}"):
+                continue  # thread exited while listing
+            return None
+        children.extend(int(child) for child in text.split())
+    return children
+
+
+def _process_tree_scan(root_pid):
+    """Fallback: build the tree from the ppid of every process in /proc"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            stat = read_stat(int(entry))
+            if stat is not None:
+                children.setdefault(stat[0], []).append(int(entry))
+    tree, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, ()))
+    return tree
+
+
+def process_tree(root_pid):
+    """root_pid plus all its descendants; cost grows with the tree, not the host"""
+    tree, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        children = _children(pid)
+        if children is None:
+            return _process_tree_scan(root_pid)
+        stack.extend(children)
+    return tree
+
+
+class ProcessTreeSampler:
+    """
+    Background thread sampling a process tree every `interval` seconds
+
+    Totals are as of the last sample: CPU time of descendants that exit
+    is kept from their last sample, and work done after the final sample
+    is not counted, so shorter intervals give more complete totals.
+
+    Args:
+        pid: Root process to monitor
+        interval: Seconds between samples (larger = lower overhead)
+    """
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._cpu_by_pid = {}
+        self._io_by_pid = {}
+        self._peak_by_pid = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{pid}", daemon=True)
+        self._sampler_cpu_s = 0.0
+        self._started = None
+        self._ended = None
+
+    def start(self):
+        self._started = time.monotonic()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the summary"""
+        self._stop.set()
+        self._thread.join()
+        return self.summary()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        cpu_start = time.thread_time()
+        while True:
+            alive = self._sample(process_tree(self.pid))
+            if not alive or self._stop.wait(self.interval):
+                break
+        self._ended = time.monotonic()
+        self._sampler_cpu_s = time.thread_time() - cpu_start
+
+    def _sample(self, pids):
+        rss = n_procs = 0
+        for pid in pids:
+            stat = read_stat(pid)
+            if stat is None:
+                continue  # exited; its last CPU/IO sample is kept
+            n_procs += 1
+            self._cpu_by_pid[pid] = stat[1]
+            rss += stat[2]
+            self._io_by_pid[pid] = read_io(pid)
+            self._peak_by_pid[pid] = max(self._peak_by_pid.get(pid, 0), read_peak_rss(pid))
+        if n_procs == 0:
+            return False
+
+        now = time.monotonic() - self._started
+        cpu_s = sum(self._cpu_by_pid.values())
+        previous = self.samples[-1] if self.samples else {"t": 0.0, "cpu_s": 0.0}
+        elapsed = now - previous["t"]
+        self.samples.append({
+            "t": round(now, 3),
+            "cpu_s": round(cpu_s, 3),
+            "cpu_percent": round(100 * (cpu_s - previous["cpu_s"]) / elapsed, 1) if elapsed else 0.0,
+            "rss_mb": round(rss / 1e6, 1),
+            "processes": n_procs,
+            "read_mb": round(sum(r for r, _ in self._io_by_pid.values()) / 1e6, 2),
+            "write_mb": round(sum(w for _, w in self._io_by_pid.values()) / 1e6, 2),
+        })
+        return True
+
+    def summary(self):
+        if not self.samples:
+            return {"samples": 0}
+        last = self.samples[-1]
+        wall = (self._ended or time.monotonic()) - self._started
+        return {
+            "samples": len(self.samples),
+            "duration_s": round(wall, 2),
+            "cpu_s": last["cpu_s"],
+            "avg_cpu_percent": round(100 * last["cpu_s"] / wall, 1) if wall else 0.0,
+            "max_cpu_percent": max(s["cpu_percent"] for s in self.samples),
+            "peak_tree_rss_mb": max(s["rss_mb"] for s in self.samples),
+            "peak_process_rss_mb": round(max(self._peak_by_pid.values(), default=0) / 1e6, 1),
+            "max_processes": max(s["processes"] for s in self.samples),
+            "read_mb": last["read_mb"],
+            "write_mb": last["write_mb"],
+            "sampler_overhead_percent": round(100 * self._sampler_cpu_s / wall, 3) if wall else 0.0,
+        }
+
+
+def run_monitored(args, interval=0.5, **popen_kwargs):
+    """subprocess.run-style helper: returns (returncode, sampler)"""
+    proc = subprocess.Popen(args, **popen_kwargs)
+    sampler = ProcessTreeSampler(proc.pid, interval).start()
+    try:
+        proc.wait()
+    finally:
+        sampler.stop()
+    return proc.returncode, sampler
+
+
+class MonitoredProcessRunner(runner.AsyncProcessRunner):
+    """
+    AsyncProcessRunner that samples every command's process tree
+
+    Each ProcessResult gains `resources` (summary dict) and `samples`
+    (time series) attributes.
+
+    Args:
+        sample_interval: Seconds between /proc samples
+        **kwargs: AsyncProcessRunner arguments
+    """
+
+    def __init__(self, sample_interval=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.sample_interval = sample_interval
+
+    def _process_started(self, proc, name):
+        return ProcessTreeSampler(proc.pid, self.sample_interval).start()
+
+    def _process_finished(self, sampler, result):
+        result.resources = sampler.stop()
+        result.samples = sampler.samples
+        return result
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    import tempfile
+
+    # Stand-in training script: allocates memory in steps, burns CPU in a
+    # worker subprocess and writes a checkpoint
+    trainer = (
+        "import os, subprocess, sys, time\n"
+        "worker = subprocess.Popen([sys.executable, '-c', "
+        "'import time\\nt = time.time()\\nwhile time.time() - t < 1.5: pass'])\n"
+        "blocks = []\n"
+        "for step in range(6):\n"
+        "    blocks.append(bytearray(40 * 1024 * 1024))\n"
+        "    sum(range(300_000))\n"
+        "    time.sleep(0.25)\n"
+        "with open(sys.argv[1], 'wb') as f:\n"
+        "    f.write(os.urandom(20 * 1024 * 1024)); f.flush(); os.fsync(f.fileno())\n"
+        "worker.wait()\n"
+    )
+    checkpoint = os.path.join(tempfile.mkdtemp(), "ckpt.bin")
+
+    # Example 1: Time Series and Summary for One Training Run
+    print("=== Monitored Subprocess ===")
+    returncode, sampler = run_monitored([sys.executable, "-c", trainer, checkpoint],
+                                        interval=0.25)
+    print(f"Exit code: {returncode}")
+    for sample in sampler.samples:
+        print(f"  {sample}")
+    print(f"Summary: {sampler.summary()}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Monitoring Mode of the Async Runner
+    print("=== Monitored Async Runner ===")
+    monitored = MonitoredProcessRunner(sample_interval=0.5, max_concurrency=4)
+    results = asyncio.run(monitored.run_many(
+        [(f"train-{i}", [sys.executable, "-c", trainer, f"{checkpoint}.{i}"]) for i in range(4)]))
+    for result in results:
+        r = result.resources
+        print(f"  {result.name}: exit={result.exit_code} cpu={r['cpu_s']}s "
+              f"peak_rss={r['peak_process_rss_mb']}MB write={r['write_mb']}MB "
+              f"overhead={r['sampler_overhead_percent']}%")
+
+    print("\n=== Resource Sampling Benefits in MLOps ===")
+    print("- Memory growth is visible long before the OOM killer fires")
+    print("- Child and grandchild processes are included in the totals")
+    print("- Per-run summaries make right-sizing job requests straightforward")
+    print("- Sampling costs well under 1% CPU at sub-second intervals")
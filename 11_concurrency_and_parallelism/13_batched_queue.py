@@ -0,0 +1,336 @@
+#!/usr/bin/python3
+"""
+Bounded Batched Queue for MLOps
+Demonstrates a queue with bounded capacity for backpressure, batch
+put_many/get_many to cut per-item locking and pickling, and a clean
+close protocol for N producers and M consumers, in a thread variant
+and a multiprocessing variant (no racy `while not q.empty()` loops)
+"""
+
+import collections
+import multiprocessing
+import queue
+import threading
+import time
+
+
+class Closed(Exception):
+    """Raised by put on a closed queue, and by get once it is closed and drained"""
+
+
+class BatchQueue:
+    """
+    Thread-safe bounded queue with batch operations
+
+    Args:
+        maxsize: Maximum queued items; producers block when it is full
+        producers: Number of producers; the queue closes itself when
+            each has called producer_done() (0 = close() manually)
+    """
+
+    def __init__(self, maxsize=10_000, producers=0):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._producers = producers
+        self._closed = False
+
+    def put_many(self, items, timeout=None):
+        """
+        Append items, blocking while the queue is full
+
+        Items are inserted as space frees up, so a batch larger than
+        maxsize still goes through. Raises queue.Full on timeout (items
+        already inserted stay queued) and Closed after close().
+        """
+        items = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while items:
+                if self._closed:
+                    raise Closed("put on closed queue")
+                room = self.maxsize - len(self._items)
+                if room <= 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Full
+                    self._not_full.wait(remaining)
+                    continue
+                self._items.extend(items[:room])
+                del items[:room]
+                self._not_empty.notify_all()
+
+    def put(self, item, timeout=None):
+        self.put_many((item,), timeout)
+
+    def get_many(self, max_items=1000, timeout=None):
+        """
+        Remove and return up to max_items, waiting for at least one
+
+        Raises queue.Empty on timeout and Closed once the queue is closed
+        and empty, which is the consumer's signal to exit.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while not self._items:
+                if self._closed:
+                    raise Closed("queue closed and drained")
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._not_empty.wait(remaining)
+            n = min(max_items, len(self._items))
+            batch = [self._items.popleft() for _ in range(n)]
+            self._not_full.notify_all()
+            return batch
+
+    def get(self, timeout=None):
+        return self.get_many(1, timeout)[0]
+
+    def producer_done(self):
+        """Called once by each producer; the last one closes the queue"""
+        with self._lock:
+            self._producers -= 1
+            if self._producers <= 0:
+                self._close_locked()
+
+    def close(self):
+        """No more puts; consumers drain what is left, then get Closed"""
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self):
+        self._closed = True
+        self._not_empty.notify_all()
+        self._not_full.notify_all()
+
+    def qsize(self):
+        with self._lock:
+            return len(self._items)
+
+    def __iter__(self):
+        """Iterate over batches until the queue is closed and drained"""
+        while True:
+            try:
+                yield self.get_many()
+            except Closed:
+                return
+
+
+_PRODUCER_DONE = "__batch_queue_producer_done__"
+_SENTINEL = "__batch_queue_closed__"
+
+
+class ProcessBatchQueue:
+    """
+    Multiprocessing variant: items travel in pickled batches
+
+    One multiprocessing.Queue message carries up to batch_size items, so
+    the lock, pipe write and pickle overhead is paid per batch. Each
+    producer_done() sends a marker behind that producer's data; the
+    consumer that takes the last marker has seen every batch leave the
+    pipe, so it sends one sentinel per remaining consumer and every
+    consumer drains and then sees Closed. The underlying queue is never
+    closed, so one process may both produce and consume.
+
+    Args:
+        maxsize: Maximum queued batches (capacity = maxsize * batch_size items)
+        producers: Number of producer processes
+        consumers: Number of consumer processes
+        batch_size: Items per message
+        ctx: multiprocessing context
+    """
+
+    def __init__(self, maxsize=64, producers=1, consumers=1, batch_size=512, ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.batch_size = batch_size
+        self.consumers = consumers
+        self._queue = ctx.Queue(maxsize)
+        self._producers = ctx.Value("i", producers)
+        self._buffer = []   # per-process leftovers when a batch exceeds max_items
+        self._put_closed = False  # this process called producer_done()
+        self._drained = False     # this process's consumer saw the end of stream
+
+    def put_many(self, items, timeout=None):
+        if self._put_closed:
+            raise Closed("put after producer_done()")
+        items = list(items)
+        for i in range(0, len(items), self.batch_size):
+            self._queue.put(items[i:i + self.batch_size], timeout=timeout)
+
+    def get_many(self, max_items=1000, timeout=None):
+        """Up to max_items; queue.Empty on timeout, Closed when producers are done"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._buffer:
+            if self._drained:
+                raise Closed("queue closed and drained")
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            batch = self._queue.get(timeout=remaining)
+            if batch == _PRODUCER_DONE:
+                self._producer_finished()
+            elif batch == _SENTINEL:
+                self._drained = True
+            else:
+                self._buffer = batch
+        result, self._buffer = self._buffer[:max_items], self._buffer[max_items:]
+        return result
+
+    def producer_done(self):
+        """Called by each producer process after its last put_many; repeats are ignored"""
+        if self._put_closed:
+            return
+        self._put_closed = True
+        # Sent by this process's feeder thread, so it follows all of this producer's data
+        self._queue.put(_PRODUCER_DONE)
+
+    def _producer_finished(self):
+        with self._producers.get_lock():
+            self._producers.value -= 1
+            last = self._producers.value == 0
+        if last:
+            # Every marker has left the pipe and each one followed its producer's
+            # data, so nothing but the sentinels is still to come
+            for _ in range(self.consumers - 1):
+                self._queue.put(_SENTINEL)
+            self._drained = True
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.get_many()
+            except Closed:
+                return
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_buffer"] = []  # fresh per-process state
+        state["_put_closed"] = state["_drained"] = False
+        return state
+
+
+# Example workers: module-level so they can run in child processes ------------------
+
+def produce(q, start, count, batch=1000):
+    for i in range(start, start + count, batch):
+        q.put_many(range(i, min(i + batch, start + count)))
+    q.producer_done()
+
+
+def consume(q, results):
+    total = n = 0
+    for batch in q:
+        total += sum(batch)
+        n += len(batch)
+    results.put((n, total))
+
+
+if __name__ == "__main__":
+    # Example 1: Per-Item queue.Queue vs Batched Queue (threads)
+    # 4 producers, 3 consumers, 400k items
+    print("=== Thread Variant: Per-Item vs Batched ===")
+    n_items, n_producers, n_consumers = 400_000, 4, 3
+    per_producer = n_items // n_producers
+    expected = sum(range(n_items))
+
+    q = queue.Queue(maxsize=10_000)
+    totals = queue.Queue()
+
+    def item_producer(start):
+        for i in range(start, start + per_producer):
+            q.put(i)
+
+    def item_consumer():
+        total = 0
+        while (item := q.get()) is not None:
+            total += item
+        totals.put(total)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=item_producer, args=(p * per_producer,))
+               for p in range(n_producers)]
+    consumers = [threading.Thread(target=item_consumer) for _ in range(n_consumers)]
+    for t in threads + consumers:
+        t.start()
+    for t in threads:
+        t.join()
+    for _ in consumers:
+        q.put(None)  # one poison pill per consumer, only after every producer finished
+    for t in consumers:
+        t.join()
+    item_s = time.perf_counter() - start
+    ok = sum(totals.get() for _ in consumers) == expected
+    print(f"queue.Queue, one item at a time: {item_s:.2f}s (correct: {ok})")
+
+    bq = BatchQueue(maxsize=10_000, producers=n_producers)
+    results = queue.Queue()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=produce, args=(bq, p * per_producer, per_producer))
+               for p in range(n_producers)]
+    consumers = [threading.Thread(target=consume, args=(bq, results))
+                 for _ in range(n_consumers)]
+    for t in threads + consumers:
+        t.start()
+    for t in threads + consumers:
+        t.join()
+    batch_s = time.perf_counter() - start
+    counts = [results.get() for _ in consumers]
+    ok = sum(total for _, total in counts) == expected
+    print(f"BatchQueue, put_many/get_many:   {batch_s:.2f}s (correct: {ok}, "
+          f"{item_s / batch_s:.0f}x faster)")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Backpressure
+    # A fast producer is held to the queue's capacity instead of filling memory
+    print("=== Backpressure ===")
+    bq = BatchQueue(maxsize=1000, producers=1)
+
+    def slow_consumer():
+        while True:
+            try:
+                bq.get_many(100)
+            except Closed:
+                return
+            time.sleep(0.001)  # e.g. a training step
+
+    consumer = threading.Thread(target=slow_consumer)
+    consumer.start()
+    peak = 0
+    for i in range(0, 50_000, 5000):
+        bq.put_many(range(i, i + 5000))  # blocks until the consumer makes room
+        peak = max(peak, bq.qsize())
+    bq.producer_done()
+    consumer.join()
+    print(f"Produced 50,000 items in batches of 5000; peak queued: {peak} "
+          f"(capacity {bq.maxsize})")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Process Variant With N Producers and M Consumers
+    # Consumers stop exactly when all producers are done: no empty() polling
+    print("=== Process Variant ===")
+    ctx = multiprocessing.get_context()
+    pq = ProcessBatchQueue(maxsize=64, producers=2, consumers=3, batch_size=1000, ctx=ctx)
+    results = ctx.Queue()
+    n_items = 1_000_000
+    start = time.perf_counter()
+    procs = [ctx.Process(target=produce, args=(pq, p * n_items // 2, n_items // 2))
+             for p in range(2)]
+    procs += [ctx.Process(target=consume, args=(pq, results)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    counts = [results.get() for _ in range(3)]
+    for p in procs:
+        p.join()
+    print(f"{sum(n for n, _ in counts):,} items across 2 producers / 3 consumers in "
+          f"{time.perf_counter() - start:.2f}s, per consumer: {[n for n, _ in counts]}, "
+          f"correct: {sum(t for _, t in counts) == sum(range(n_items))}")
+
+    print("\n=== Batched Queue Benefits in MLOps ===")
+    print("- Bounded capacity keeps fast loaders from exhausting memory")
+    print("- Batches amortize locking and pickling over many items")
+    print("- Close protocol ends every consumer exactly once, with no lost items")
@@ -0,0 +1,307 @@
+#!/usr/bin/python3
+"""
+Shared-Memory Ring Buffer for MLOps
+Demonstrates passing large NumPy feature batches from a loader process
+to trainer processes through fixed-size slots in
+multiprocessing.shared_memory: producers write in place, consumers get
+zero-copy read-only views, and only two semaphore operations per batch
+cross processes, compared against multiprocessing.Queue which pickles
+every batch
+"""
+
+import importlib
+import multiprocessing
+import os
+import queue
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Same Closed signal as the batched queue, so consumers exit the same way
+Closed = importlib.import_module("13_batched_queue").Closed
+
+_CLOSED_ROWS = -1  # row count written into a slot to mark end of stream
+
+
+def _attach(name):
+    """Attach to an existing segment without letting this process's tracker own it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRingBuffer:
+    """
+    Fixed-slot ring of NumPy batches in one shared memory segment
+
+    Layout: an int64 row count per slot, then `slots` arrays of
+    slot_shape. Each slot has its own pair of semaphores (free/full),
+    so a slot is never overwritten while a consumer still reads it,
+    even when several consumers finish out of order. With one consumer
+    the read position is process-local; with more, the shared read
+    position is advanced under its lock only once that slot is full, so
+    a get() that times out claims nothing.
+
+    Create it in the parent, pass it to Process(args=...), call
+    release() in every process when done (the creator also unlinks).
+
+    Args:
+        slots: Number of batches that can be in flight
+        slot_shape: Maximum batch shape, e.g. (rows, features)
+        dtype: NumPy dtype of batches
+        consumers: Number of consumer processes
+        ctx: multiprocessing context
+    """
+
+    def __init__(self, slots, slot_shape, dtype="float32", consumers=1, ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.slots = slots
+        self.slot_shape = tuple(slot_shape)
+        self.dtype = np.dtype(dtype)
+        self.consumers = consumers
+        self.slot_nbytes = int(np.prod(self.slot_shape)) * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=slots * 8 + slots * self.slot_nbytes)
+        self.name = self._shm.name
+        self._owner_pid = os.getpid()  # forked children inherit this, so compare pids
+        self._free = [ctx.Semaphore(1) for _ in range(slots)]
+        self._full = [ctx.Semaphore(0) for _ in range(slots)]
+        self._shared_read_pos = ctx.Value("q", 0) if consumers > 1 else None
+        self._write_pos = 0  # producer-local
+        self._read_pos = 0   # consumer-local (single-consumer mode)
+        self._map_views()
+
+    def _map_views(self):
+        buf = self._shm.buf
+        self._rows = np.ndarray((self.slots,), dtype=np.int64, buffer=buf)
+        self._data = np.ndarray((self.slots,) + self.slot_shape, dtype=self.dtype,
+                                buffer=buf, offset=self.slots * 8)
+
+    # Producer side ------------------------------------------------------------------
+
+    @contextmanager
+    def reserve(self, rows=None, timeout=None):
+        """
+        Yield the next free slot as a writable array of `rows` rows
+
+        Filling it in place avoids even the one copy that put() makes.
+        The batch is published when the block exits without error.
+        """
+        rows = self.slot_shape[0] if rows is None else rows
+        if not 0 <= rows <= self.slot_shape[0]:
+            raise ValueError(f"rows must be between 0 and {self.slot_shape[0]}")
+        index = self._write_pos % self.slots
+        if not self._free[index].acquire(timeout=timeout):
+            raise queue.Full
+        try:
+            yield self._data[index, :rows]
+        except BaseException:
+            self._free[index].release()  # not published; the slot is reused next time
+            raise
+        self._publish(index, rows)
+
+    def put(self, batch, timeout=None):
+        """Copy one batch (rows <= slot rows) into the next free slot"""
+        batch = np.asarray(batch, dtype=self.dtype)
+        if batch.shape[1:] != self.slot_shape[1:]:
+            raise ValueError(f"Batch shape {batch.shape} does not fit slots of {self.slot_shape}")
+        with self.reserve(len(batch), timeout) as slot:
+            slot[...] = batch
+
+    def close(self):
+        """Producer: after the last batch, send one end-of-stream marker per consumer"""
+        for _ in range(self.consumers):
+            index = self._write_pos % self.slots
+            self._free[index].acquire()
+            self._publish(index, _CLOSED_ROWS)
+
+    def _publish(self, index, rows):
+        self._rows[index] = rows
+        self._write_pos += 1
+        self._full[index].release()  # semaphore release orders the writes above
+
+    # Consumer side -------------------------------------------------------------------
+
+    @contextmanager
+    def get(self, timeout=None):
+        """
+        Yield the next batch as a read-only zero-copy view
+
+        The slot is handed back to the producer when the block exits, so
+        copy anything that must outlive it. Raises Closed at end of stream
+        and queue.Empty on timeout.
+        """
+        index = self._claim(timeout)
+        rows = int(self._rows[index])
+        if rows == _CLOSED_ROWS:
+            self._free[index].release()
+            raise Closed("ring buffer closed by producer")
+        view = self._data[index, :rows]
+        view.flags.writeable = False
+        try:
+            yield view
+        finally:
+            self._free[index].release()
+
+    def batches(self):
+        """Iterate over zero-copy batches until the producer closes the ring"""
+        while True:
+            try:
+                with self.get() as batch:
+                    yield batch  # slot is released when the next batch is requested
+            except Closed:
+                return
+
+    def _claim(self, timeout):
+        if self._shared_read_pos is None:
+            index = self._read_pos % self.slots
+            if not self._full[index].acquire(timeout=timeout):
+                raise queue.Empty
+            self._read_pos += 1
+            return index
+        # Waiting for the slot while holding the lock makes claim + acquire one
+        # step; consumers still read their batches in parallel after it
+        deadline = None if timeout is None else time.monotonic() + timeout
+        lock = self._shared_read_pos.get_lock()
+        if not lock.acquire(timeout=timeout):
+            raise queue.Empty
+        try:
+            index = self._shared_read_pos.value % self.slots
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._full[index].acquire(timeout=remaining):
+                raise queue.Empty
+            self._shared_read_pos.value += 1
+        finally:
+            lock.release()
+        return index
+
+    # Lifecycle ---------------------------------------------------------------------
+
+    def release(self):
+        """Unmap in this process; the creating process also unlinks the segment"""
+        self._rows = self._data = None  # views must go before the mapping closes
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ("_shm", "_rows", "_data"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = _attach(self.name)
+        self._map_views()
+
+
+# Producer/consumer workers (the 05_synchronized_queue.py pattern) -------------------
+
+def ring_producer(ring, n_batches):
+    """Loader process: fills each slot in place"""
+    for i in range(n_batches):
+        with ring.reserve() as slot:
+            slot.fill(i)  # stand-in for decoding and featurizing a batch
+    ring.close()
+    ring.release()
+
+
+def ring_consumer(ring, results):
+    """Trainer process: reads zero-copy views until the producer closes the ring"""
+    n = total = 0
+    for batch in ring.batches():
+        total += float(batch[0, 0])
+        n += 1
+    batch = None  # drop the last view, or the mapping cannot be closed
+    results.put((n, total))
+    ring.release()
+
+
+def queue_producer(q, n_batches, shape, dtype):
+    for i in range(n_batches):
+        q.put(np.full(shape, i, dtype=dtype))  # pickled and copied through a pipe
+    q.put(None)
+
+
+def queue_consumer(q, results):
+    n = total = 0
+    while (batch := q.get()) is not None:
+        total += float(batch[0, 0])
+        n += 1
+    results.put((n, total))
+
+
+if __name__ == "__main__":
+    import time
+
+    ctx = multiprocessing.get_context()
+    shape, dtype, n_batches = (4096, 1024), "float32", 64  # 16 MB batches, 1 GB total
+    batch_mb = np.prod(shape) * np.dtype(dtype).itemsize / 1e6
+    expected = float(sum(range(n_batches)))
+
+    # Example 1: multiprocessing.Queue (pickles every batch)
+    print("=== multiprocessing.Queue ===")
+    q, results = ctx.Queue(maxsize=4), ctx.Queue()
+    start = time.perf_counter()
+    procs = [ctx.Process(target=queue_producer, args=(q, n_batches, shape, dtype)),
+             ctx.Process(target=queue_consumer, args=(q, results))]
+    for p in procs:
+        p.start()
+    n, total = results.get()
+    for p in procs:
+        p.join()
+    queue_s = time.perf_counter() - start
+    print(f"{n} x {batch_mb:.0f} MB batches in {queue_s:.2f}s "
+          f"({n * batch_mb / queue_s:,.0f} MB/s), correct: {total == expected}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Shared-Memory Ring Buffer (single producer, single consumer)
+    print("=== Shared-Memory Ring Buffer ===")
+    with SharedRingBuffer(slots=4, slot_shape=shape, dtype=dtype, ctx=ctx) as ring:
+        results = ctx.Queue()
+        start = time.perf_counter()
+        procs = [ctx.Process(target=ring_producer, args=(ring, n_batches)),
+                 ctx.Process(target=ring_consumer, args=(ring, results))]
+        for p in procs:
+            p.start()
+        n, total = results.get()
+        for p in procs:
+            p.join()
+        ring_s = time.perf_counter() - start
+    print(f"{n} x {batch_mb:.0f} MB batches in {ring_s:.2f}s "
+          f"({n * batch_mb / ring_s:,.0f} MB/s), correct: {total == expected}, "
+          f"{queue_s / ring_s:.1f}x faster than Queue")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 3: Multiple Consumers
+    # Slots are claimed from a shared counter; each batch is read exactly once
+    print("=== Multi-Consumer Ring Buffer ===")
+    with SharedRingBuffer(slots=8, slot_shape=shape, dtype=dtype, consumers=3,
+                          ctx=ctx) as ring:
+        results = ctx.Queue()
+        procs = [ctx.Process(target=ring_producer, args=(ring, n_batches))]
+        procs += [ctx.Process(target=ring_consumer, args=(ring, results)) for _ in range(3)]
+        for p in procs:
+            p.start()
+        counts = [results.get() for _ in range(3)]
+        for p in procs:
+            p.join()
+    print(f"Batches per consumer: {[n for n, _ in counts]}, "
+          f"correct: {sum(t for _, t in counts) == expected}")
+
+    print("\n=== Ring Buffer Benefits in MLOps ===")
+    print("- Batches are never pickled; consumers read them in place")
+    print("- Fixed slots bound memory and give natural backpressure")
+    print("- Loader and trainer overlap without copying through pipes")
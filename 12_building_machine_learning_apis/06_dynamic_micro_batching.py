@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+"""
+Dynamic Micro-Batching for ML APIs
+Demonstrates merging concurrent /predict requests into one
+model.predict call: a background thread collects requests until the
+batch is full or the oldest request has waited max_delay_ms, runs the
+model once and routes each row's result back through a per-request
+future, with batch-size and queue-wait metrics exposed on /metrics
+"""
+
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import Flask, request, jsonify
+
+_STOP = object()
+
+
+class BatcherClosed(Exception):
+    """Raised by submit() once the batcher has been closed"""
+
+
+class _Pending:
+    """One request waiting for its row of a batch"""
+
+    __slots__ = ("features", "future", "enqueued")
+
+    def __init__(self, features):
+        self.features = features
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class BatchMetrics:
+    """
+    Thread-safe batch-size and queue-wait statistics
+
+    Args:
+        window: Recent requests/batches kept for percentiles
+    """
+
+    def __init__(self, window=10_000):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.failed_batches = 0
+        self.batch_sizes = collections.Counter()
+        self._queue_wait_s = collections.deque(maxlen=window)
+        self._predict_s = collections.deque(maxlen=window)
+
+    def record(self, queue_waits, predict_s, failed=False):
+        with self._lock:
+            self.batches += 1
+            self.requests += len(queue_waits)
+            self.failed_batches += failed
+            self.batch_sizes[len(queue_waits)] += 1
+            self._queue_wait_s.extend(queue_waits)
+            self._predict_s.append(predict_s)
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self._queue_wait_s)
+            predicts = sorted(self._predict_s)
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "failed_batches": self.failed_batches,
+                "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "queue_wait_ms": {
+                    "p50": round(_percentile(waits, 0.50) * 1000, 2),
+                    "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                    "max": round(waits[-1] * 1000, 2) if waits else 0.0,
+                },
+                "predict_ms": {
+                    "p50": round(_percentile(predicts, 0.50) * 1000, 2),
+                    "p95": round(_percentile(predicts, 0.95) * 1000, 2),
+                },
+            }
+
+
+class MicroBatcher:
+    """
+    Merge concurrent single-row predictions into batched model calls
+
+    A batch is dispatched when it reaches max_batch_size or when its
+    oldest request has waited max_delay_ms, whichever comes first, so
+    light traffic pays at most max_delay_ms of extra latency and heavy
+    traffic gets full batches. Requests that queue up while the model
+    is busy are taken immediately on the next call.
+
+    Args:
+        predict_fn: Batch function, e.g. model.predict; takes a list of
+            feature rows and returns one result per row, in order
+        max_batch_size: Most rows per predict_fn call
+        max_delay_ms: Longest a request waits for others to join its batch
+        max_queue: Pending requests before submit() raises queue.Full
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_delay_ms=5, max_queue=1024):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.metrics = BatchMetrics()
+        self._queue = queue.Queue(max_queue)
+        self._closed = False
+        self._close_lock = threading.Lock()  # nothing is queued after _STOP
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, features):
+        """Queue one feature row; returns a Future for its prediction"""
+        pending = _Pending(features)
+        with self._close_lock:
+            if self._closed:
+                raise BatcherClosed("MicroBatcher is closed")
+            self._queue.put_nowait(pending)  # queue.Full -> caller should shed load
+        return pending.future
+
+    def predict(self, features, timeout=None):
+        """
+        Blocking single-row prediction through the batcher
+
+        On timeout the request is cancelled, so it does not take a row
+        in a later batch, and FutureTimeout is raised.
+        """
+        future = self.submit(features)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def close(self):
+        """Finish queued requests, then stop the worker"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = first.enqueued + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Past the deadline, still take whatever is already queued
+                    item = (self._queue.get(timeout=remaining) if remaining > 0
+                            else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.monotonic()
+        queue_waits = [start - p.enqueued for p in batch]
+        try:
+            results = self.predict_fn([p.features for p in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"predict_fn returned {len(results)} results for {len(batch)} rows")
+        except Exception as e:
+            self.metrics.record(queue_waits, time.monotonic() - start, failed=True)
+            for p in batch:
+                p.future.set_exception(e)
+            return
+        self.metrics.record(queue_waits, time.monotonic() - start)
+        for p, result in zip(batch, results):
+            p.future.set_result(result)
+
+
+def create_app(model, batching=True, request_timeout=10.0, **batcher_kwargs):
+    """
+    Flask app with the same /predict contract as 01_introduction_to_ml_apis.py
+
+    Args:
+        model: Object with a batch predict(rows) method
+        batching: False calls model.predict per request, as in 01
+        request_timeout: Seconds a request waits for its batch result
+        **batcher_kwargs: MicroBatcher arguments
+    """
+    app = Flask(__name__)
+    batcher = MicroBatcher(model.predict, **batcher_kwargs) if batching else None
+    app.config["BATCHER"] = batcher
+
+    @app.route("/predict", methods=["POST"])
+    def predict():
+        """ML prediction endpoint; concurrent requests share one model call"""
+        data = request.json
+        if batcher is None:
+            prediction = model.predict([data["features"]])[0]
+        else:
+            try:
+                prediction = batcher.predict(data["features"], timeout=request_timeout)
+            except (queue.Full, BatcherClosed):
+                return jsonify({"error": "server overloaded or shutting down"}), 503
+            except FutureTimeout:
+                return jsonify({"error": f"prediction timed out after {request_timeout}s"}), 504
+            except Exception as e:
+                # Raised by the model for the whole batch (or a result-count mismatch)
+                return jsonify({"error": f"prediction failed: {type(e).__name__}: {e}"}), 500
+        if hasattr(prediction, "tolist"):
+            prediction = prediction.tolist()  # NumPy scalar -> JSON-serializable
+        return jsonify({"prediction": [prediction]})
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Batch-size and queue-wait statistics"""
+        return jsonify(batcher.metrics.snapshot() if batcher else {"batching": False})
+
+    return app
+
+
+if __name__ == "__main__":
+    import json
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    from werkzeug.serving import make_server
+
+    class DeviceBoundModel:
+        """
+        Stand-in for joblib.load("model.pkl") on one accelerator: each
+        predict call costs a fixed 10 ms plus 0.05 ms per row, one call at a time
+        """
+
+        def __init__(self):
+            self._device = threading.Lock()
+            self.calls = 0
+
+        def predict(self, rows):
+            with self._device:
+                self.calls += 1
+                time.sleep(0.010 + 0.00005 * len(rows))
+                return [sum(row) for row in rows]
+
+    def post(url, payload):
+        req = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req) as response:
+            return json.loads(response.read())
+
+    def load_test(app, n_requests=400, concurrency=64):
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            responses = list(pool.map(lambda i: post(f"{url}/predict", {"features": [i, 1, 2]}),
+                                      range(n_requests)))
+        elapsed = time.perf_counter() - start
+        correct = all(r["prediction"] == [i + 3] for i, r in enumerate(responses))
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            metrics = json.loads(response.read())
+        server.shutdown()
+        return elapsed, correct, metrics
+
+    # Example 1: One model.predict Call per Request (as in 01)
+    print("=== Per-Request Prediction ===")
+    model = DeviceBoundModel()
+    elapsed, correct, _ = load_test(create_app(model, batching=False))
+    print(f"400 requests in {elapsed:.2f}s ({400 / elapsed:.0f} req/s), "
+          f"model calls: {model.calls}, correct: {correct}")
+
+    print("\n" + "="*50 + "\n")
+
+    # Example 2: Dynamic Micro-Batching
+    # Up to 32 rows per call; a lone request waits at most 5 ms
+    print("=== Micro-Batched Prediction ===")
+    model = DeviceBoundModel()
+    app = create_app(model, max_batch_size=32, max_delay_ms=5)
+    elapsed, correct, metrics = load_test(app)
+    print(f"400 requests in {elapsed:.2f}s ({400 / elapsed:.0f} req/s), "
+          f"model calls: {model.calls}, correct: {correct}")
+    print(f"Metrics: {metrics}")
+    app.config["BATCHER"].close()
+
+    print("\n=== Micro-Batching Benefits in MLOps ===")
+    print("- Per-call model overhead is shared by every request in a batch")
+    print("- max_delay_ms caps the latency added under light traffic")
+    print("- Each caller still gets exactly its own result back")
+    print("- Batch-size and queue-wait metrics show how to tune both limits")